@@ -2,33 +2,75 @@
 FastAPI Backend Server for Radiology AI Assistant
 Provides REST API endpoints for the React frontend.
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, BinaryIO
+from contextlib import asynccontextmanager
 from datetime import datetime
-import io
+import asyncio
 from PIL import Image
-import json
-import os
+from pathlib import Path
 import sys
 
+import orjson
+
+# Project paths, resolved once at import time
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RADLEX_PATH = PROJECT_ROOT / "assets" / "radlex_terms.json"
+FEEDBACK_LOG_PATH = PROJECT_ROOT / "outputs" / "feedback_logs.jsonl"
+LEARNING_DATA_PATH = PROJECT_ROOT / "outputs" / "learning_data.jsonl"
+
 # Add parent directory to path to import modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(str(PROJECT_ROOT))
 
 from modules.radlex_loader import load_radlex_terms
-from modules.json_report_generator import generate_json_report, format_json_report_to_text
+from modules.json_report_generator import generate_json_report_async, format_json_report_to_text
 from modules.ontology_processor import OntologyProcessor
 from modules.explainability import ExplainabilityEngine
 from modules.feedback_logger import FeedbackLogger
 from modules.continuous_learning import ContinuousLearningEngine
 from modules.chexpert_simulator import simulate_chexpert_labels
-from modules.report_evaluator import compare_labels_with_report
+from modules.report_evaluator import build_radlex_index, compare_labels_with_report
 from modules.analytics import AnalyticsEngine
-from config import OPENAI_API_KEY, OPENAI_MODEL
+from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_CONCURRENCY, API_WORKERS
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Defined here because fastapi.responses.ORJSONResponse is deprecated in
+    recent FastAPI releases.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
 
-app = FastAPI(title="Radiology AI Assistant API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load RadLex terms and build the shared engines once per worker.
+    
+    Only the OntologyProcessor depends on the uploaded image (through its
+    CheXpert labels), so everything else is reused across requests.
+    """
+    app.state.radlex_terms = load_radlex_terms(str(RADLEX_PATH))
+    app.state.radlex_index = build_radlex_index(app.state.radlex_terms)
+    app.state.explainability_engine = ExplainabilityEngine()
+    app.state.learning_engine = ContinuousLearningEngine(str(LEARNING_DATA_PATH))
+    app.state.feedback_logger = FeedbackLogger(str(FEEDBACK_LOG_PATH.parent))
+    yield
+
+
+app = FastAPI(
+    title="Radiology AI Assistant API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -72,8 +114,188 @@ async def health_check():
     }
 
 
+# Maximum number of images processed at once by the batch endpoint
+BATCH_CONCURRENCY = 8
+
+# Uploads are decoded no larger than this; the model sees a smaller image anyway
+MAX_DECODE_SIZE = (1024, 1024)
+
+# Upload formats sent to OpenAI without re-encoding, keyed by PIL format name
+PASSTHROUGH_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+# Passthrough is limited to images the generator would not downscale anyway
+PASSTHROUGH_MAX_SIZE = 512
+
+
+# Caps in-flight OpenAI requests per worker to stay under the account rate limit
+_openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+
+def _prepare_upload_image(image_file: BinaryIO) -> Dict[str, Any]:
+    """
+    Prepare an uploaded image for the report generator.
+    
+    Small JPEG/PNG/WEBP uploads are passed through as raw bytes, since the
+    generator would only re-encode them. Anything else is decoded, downscaled
+    to at most MAX_DECODE_SIZE and handed over as a PIL image.
+    
+    Args:
+        image_file: File object of the upload (read lazily by PIL, never buffered whole)
+    
+    Returns:
+        Keyword arguments for generate_json_report_async
+    """
+    # Image.open only parses the header; pixels are decoded on demand
+    image = Image.open(image_file)
+    mime = PASSTHROUGH_MIME_TYPES.get(image.format)
+    if mime and max(image.size) <= PASSTHROUGH_MAX_SIZE:
+        image_file.seek(0)
+        return {"image": None, "image_bytes": image_file.read(), "mime": mime}
+    
+    # For JPEGs, draft() lets libjpeg decode at 1/2, 1/4 or 1/8 scale
+    image.draft("RGB", MAX_DECODE_SIZE)
+    image = image.convert("RGB")
+    image.thumbnail(MAX_DECODE_SIZE, Image.Resampling.BILINEAR)
+    return {"image": image}
+
+
+def _process_report_sync(original_report: Dict[str, Any], image_name: str) -> Dict[str, Any]:
+    """
+    Run the blocking post-processing pipeline on a generated report.
+    
+    Executed in a worker thread so ontology mapping, explainability and
+    disk I/O do not stall the event loop. Shared engines come from app.state.
+    
+    Args:
+        original_report: Structured report returned by the model
+        image_name: Original filename of the upload
+    """
+    radlex_terms = app.state.radlex_terms
+    
+    # Load CheXpert labels
+    chexpert_labels = simulate_chexpert_labels(image_name)
+    
+    # Step 2: Ontology Processing
+    ontology_processor = OntologyProcessor(
+        radlex_terms, chexpert_labels, app.state.radlex_index
+    )
+    mapped_findings = ontology_processor.map_findings_to_ontology(
+        original_report.get("findings", [])
+    )
+    validation_results = ontology_processor.validate_findings(mapped_findings)
+    ontology_stats = ontology_processor.get_ontology_statistics(mapped_findings)
+    
+    # Update report with mapped findings
+    original_report["findings"] = mapped_findings
+    ontology_mapping = {
+        "validation": validation_results,
+        "statistics": ontology_stats
+    }
+    
+    # Step 3: Explainability
+    explainability_engine = app.state.explainability_engine
+    explained_findings = explainability_engine.generate_explanations(mapped_findings)
+    explanation_summary = explainability_engine.generate_summary_explanation(explained_findings)
+    
+    explanations = {
+        "findings": explained_findings,
+        "summary": explanation_summary
+    }
+    
+    # Step 4: Apply Continuous Learning Rules
+    learning_engine = app.state.learning_engine
+    improved_report = learning_engine.apply_rules_to_report(original_report)
+    
+    # Step 5: Calculate Accuracy Metrics
+    # Text version of the report, used for label comparison and the response
+    text_report = format_json_report_to_text(improved_report)
+    
+    # Compare with CheXpert labels
+    matched_labels, missed_labels = compare_labels_with_report(
+        chexpert_labels, 
+        text_report, 
+        radlex_terms,
+        app.state.radlex_index
+    )
+    
+    # Calculate accuracy
+    total_labels = len(chexpert_labels)
+    accuracy = len(matched_labels) / total_labels if total_labels > 0 else 1.0
+    
+    # Calculate additional metrics
+    precision = len(matched_labels) / len(improved_report.get("findings", [])) if improved_report.get("findings") else 0
+    recall = len(matched_labels) / total_labels if total_labels > 0 else 0
+    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+    
+    accuracy_metrics = {
+        "accuracy": round(accuracy, 3),
+        "precision": round(precision, 3),
+        "recall": round(recall, 3),
+        "f1_score": round(f1_score, 3),
+        "matched_labels": matched_labels,
+        "missed_labels": missed_labels,
+        "total_labels": total_labels,
+        "total_findings": len(improved_report.get("findings", []))
+    }
+    
+    return {
+        "success": True,
+        "report": improved_report,
+        "text_report": text_report,
+        "explanations": explanations,
+        "ontology_mapping": ontology_mapping,
+        "accuracy_metrics": accuracy_metrics,
+        "image_name": image_name
+    }
+
+
+def _auto_log_report(result: Dict[str, Any]):
+    """
+    Automatically log a generated report for analytics.
+    
+    Runs as a background task after the response has been sent.
+    """
+    try:
+        app.state.feedback_logger.log_feedback(
+            image_name=result["image_name"],
+            original_report=result["report"],
+            edited_report=None,  # No edits yet
+            explanations=result["explanations"],
+            ontology_mapping=result["ontology_mapping"],
+            user_feedback={},
+            metadata={"auto_logged": True}
+        )
+    except Exception as log_error:
+        # Don't fail the request if logging fails
+        print(f"Warning: Failed to log report for analytics: {log_error}")
+
+
+async def _generate_report_for_upload(file: UploadFile) -> Dict[str, Any]:
+    """
+    Generate the full report for one upload.
+    
+    Decoding and post-processing run in worker threads; the OpenAI round
+    trip is awaited on the event loop so concurrent requests overlap.
+    """
+    image_kwargs = await asyncio.to_thread(_prepare_upload_image, file.file)
+    
+    # Step 1: Generate JSON Report
+    async with _openai_semaphore:
+        original_report = await generate_json_report_async(
+            **image_kwargs,
+            api_key=OPENAI_API_KEY,
+            model_name=OPENAI_MODEL
+        )
+    
+    return await asyncio.to_thread(
+        _process_report_sync,
+        original_report,
+        file.filename or "uploaded_image.jpg"
+    )
+
+
 @app.post("/api/generate-report")
-async def generate_report(file: UploadFile = File(...)):
+async def generate_report(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Generate enhanced radiology report from uploaded X-ray image.
     
@@ -84,121 +306,63 @@ async def generate_report(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail="OpenAI API key not configured")
     
     try:
-        # Read and process image
-        image_data = await file.read()
-        image = Image.open(io.BytesIO(image_data)).convert("RGB")
-        
-        # Load RadLex terms and CheXpert labels
-        # Path relative to project root (parent of backend)
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        radlex_path = os.path.join(project_root, "assets", "radlex_terms.json")
-        radlex_terms = load_radlex_terms(radlex_path)
-        chexpert_labels = simulate_chexpert_labels(file.filename or "uploaded_image.jpg")
-        
-        # Step 1: Generate JSON Report
-        original_report = generate_json_report(
-            image=image,
-            api_key=OPENAI_API_KEY,
-            model_name=OPENAI_MODEL
-        )
-        
-        # Step 2: Ontology Processing
-        ontology_processor = OntologyProcessor(radlex_terms, chexpert_labels)
-        mapped_findings = ontology_processor.map_findings_to_ontology(
-            original_report.get("findings", [])
-        )
-        validation_results = ontology_processor.validate_findings(mapped_findings)
-        ontology_stats = ontology_processor.get_ontology_statistics(mapped_findings)
-        
-        # Update report with mapped findings
-        original_report["findings"] = mapped_findings
-        ontology_mapping = {
-            "validation": validation_results,
-            "statistics": ontology_stats
-        }
-        
-        # Step 3: Explainability
-        explainability_engine = ExplainabilityEngine()
-        explained_findings = explainability_engine.generate_explanations(mapped_findings)
-        explanation_summary = explainability_engine.generate_summary_explanation(explained_findings)
-        
-        explanations = {
-            "findings": explained_findings,
-            "summary": explanation_summary
-        }
-        
-        # Step 4: Apply Continuous Learning Rules
-        learning_engine = ContinuousLearningEngine()
-        improved_report = learning_engine.apply_rules_to_report(original_report)
-        
-        # Step 5: Calculate Accuracy Metrics
-        from modules.report_evaluator import compare_labels_with_report
-        from modules.json_report_generator import format_json_report_to_text
-        
-        # Get report text for comparison
-        report_text = format_json_report_to_text(improved_report)
-        
-        # Compare with CheXpert labels
-        matched_labels, missed_labels = compare_labels_with_report(
-            chexpert_labels, 
-            report_text, 
-            radlex_terms
-        )
-        
-        # Calculate accuracy
-        total_labels = len(chexpert_labels)
-        accuracy = len(matched_labels) / total_labels if total_labels > 0 else 1.0
-        
-        # Calculate additional metrics
-        precision = len(matched_labels) / len(improved_report.get("findings", [])) if improved_report.get("findings") else 0
-        recall = len(matched_labels) / total_labels if total_labels > 0 else 0
-        f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-        
-        accuracy_metrics = {
-            "accuracy": round(accuracy, 3),
-            "precision": round(precision, 3),
-            "recall": round(recall, 3),
-            "f1_score": round(f1_score, 3),
-            "matched_labels": matched_labels,
-            "missed_labels": missed_labels,
-            "total_labels": total_labels,
-            "total_findings": len(improved_report.get("findings", []))
-        }
+        result = await _generate_report_for_upload(file)
         
-        # Format text version (without structured report section)
-        text_report = format_json_report_to_text(improved_report)
-        
-        # Automatically log the report generation for analytics
-        try:
-            from modules.feedback_logger import FeedbackLogger
-            feedback_logger = FeedbackLogger()
-            feedback_logger.log_feedback(
-                image_name=file.filename or "uploaded_image.jpg",
-                original_report=improved_report,
-                edited_report=None,  # No edits yet
-                explanations=explanations,
-                ontology_mapping=ontology_mapping,
-                user_feedback={},
-                metadata={"auto_logged": True}
-            )
-        except Exception as log_error:
-            # Don't fail the request if logging fails
-            print(f"Warning: Failed to log report for analytics: {log_error}")
-        
-        return {
-            "success": True,
-            "report": improved_report,
-            "text_report": text_report,
-            "explanations": explanations,
-            "ontology_mapping": ontology_mapping,
-            "accuracy_metrics": accuracy_metrics,
-            "image_name": file.filename or "uploaded_image.jpg"
-        }
+        # Write the analytics log after the response is sent
+        background_tasks.add_task(_auto_log_report, result)
+        return result
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
 
+@app.post("/api/batch-generate-report")
+async def batch_generate_report(background_tasks: BackgroundTasks, files: List[UploadFile] = File(...)):
+    """
+    Generate enhanced radiology reports for several uploaded X-ray images.
+    
+    Images are processed concurrently (at most BATCH_CONCURRENCY at a time)
+    and rules are mined once for the whole batch.
+    
+    Returns:
+        - One result per uploaded file, in upload order, each with its own success flag
+    """
+    if not OPENAI_API_KEY:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    try:
+        # Warm the rules cache once so concurrent items don't each re-mine it
+        await asyncio.to_thread(app.state.learning_engine.mine_rules)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def run_one(file: UploadFile) -> Dict[str, Any]:
+        async with semaphore:
+            return await _generate_report_for_upload(file)
+    
+    outcomes = await asyncio.gather(*(run_one(f) for f in files), return_exceptions=True)
+    
+    results = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, BaseException):
+            results.append({
+                "success": False,
+                "image_name": file.filename or "uploaded_image.jpg",
+                "error": f"Error generating report: {str(outcome)}"
+            })
+        else:
+            background_tasks.add_task(_auto_log_report, outcome)
+            results.append(outcome)
+    
+    return {
+        "success": True,
+        "results": results,
+        "count": len(results)
+    }
+
+
 @app.post("/api/save-feedback")
 async def save_feedback(feedback: FeedbackRequest):
     """
@@ -212,9 +376,8 @@ async def save_feedback(feedback: FeedbackRequest):
                 detail="No edited report provided. Please make edits before saving."
             )
         
-        feedback_logger = FeedbackLogger()
-        
-        entry = feedback_logger.log_feedback(
+        entry = await asyncio.to_thread(
+            app.state.feedback_logger.log_feedback,
             image_name=feedback.image_name,
             original_report=feedback.original_report,
             edited_report=feedback.edited_report,
@@ -243,11 +406,8 @@ async def get_learning_stats():
     Get continuous learning statistics.
     """
     try:
-        learning_engine = ContinuousLearningEngine()
-        stats = learning_engine.get_learning_statistics()
-        
-        feedback_logger = FeedbackLogger()
-        feedback_stats = feedback_logger.get_feedback_statistics()
+        stats = await asyncio.to_thread(app.state.learning_engine.get_learning_statistics)
+        feedback_stats = await asyncio.to_thread(app.state.feedback_logger.get_feedback_statistics)
         
         return {
             "success": True,
@@ -265,8 +425,7 @@ async def get_rules():
     Get mined rules from continuous learning.
     """
     try:
-        learning_engine = ContinuousLearningEngine()
-        rules = learning_engine.mine_rules()
+        rules = await asyncio.to_thread(app.state.learning_engine.mine_rules)
         
         return {
             "success": True,
@@ -284,19 +443,11 @@ async def get_analytics():
     Get comprehensive analytics report.
     """
     try:
-        from modules.analytics import AnalyticsEngine
-        import os
-        
-        # Ensure analytics uses correct path relative to project root
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        feedback_log_path = os.path.join(project_root, "outputs", "feedback_logs.json")
-        learning_data_path = os.path.join(project_root, "outputs", "learning_data.json")
-        
         analytics_engine = AnalyticsEngine(
-            feedback_log_path=feedback_log_path,
-            learning_data_path=learning_data_path
+            feedback_log_path=str(FEEDBACK_LOG_PATH),
+            learning_data_path=str(LEARNING_DATA_PATH)
         )
-        report = analytics_engine.generate_analytics_report()
+        report = await asyncio.to_thread(analytics_engine.generate_analytics_report)
         
         return {
             "success": True,
@@ -310,5 +461,16 @@ async def get_analytics():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need an import string; app_dir puts the project root on
+    # sys.path so it resolves however the script is started. loop/http "auto"
+    # pick uvloop and httptools (installed with uvicorn[standard]) where available
+    uvicorn.run(
+        "backend.main:app",
+        app_dir=str(PROJECT_ROOT),
+        host="0.0.0.0",
+        port=8000,
+        workers=API_WORKERS,
+        loop="auto",
+        http="auto"
+    )
 
@@ -8,3 +8,9 @@ load_dotenv(BASE_DIR / ".env", override=False)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+
+# Number of uvicorn worker processes when running backend/main.py directly
+API_WORKERS = int(os.getenv("API_WORKERS", max(2, (os.cpu_count() or 2) // 2)))
+
+# Maximum concurrent OpenAI requests per worker; keep under the account rate limit
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
@@ -0,0 +1,78 @@
+"""
+Image Encoding Module
+Resizes and base64-encodes images for the OpenAI vision models.
+"""
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image
+
+try:
+    import pybase64 as base64
+except ImportError:  # Optional: SIMD encoder, falls back to the stdlib
+    import base64
+
+
+def _reopen_unloaded_jpeg(image: Image.Image) -> Optional[Image.Image]:
+    """
+    Open a private copy of a JPEG that has not been decoded yet.
+    
+    draft() shrinks the image it is called on, so it must never run on the
+    caller's object. The copy is re-read from the image's file or stream;
+    None if there is nothing to re-read or the source no longer matches.
+    """
+    if image.format != "JPEG" or not getattr(image, "tile", None):
+        return None
+    
+    try:
+        if getattr(image, "filename", ""):
+            source = Image.open(image.filename)
+        else:
+            fp = getattr(image, "fp", None)
+            if fp is None:
+                return None
+            # Leave the caller's stream where it was for its own lazy load
+            position = fp.tell()
+            try:
+                fp.seek(0)
+                data = fp.read()
+            finally:
+                fp.seek(position)
+            source = Image.open(BytesIO(data))
+    except (OSError, ValueError):
+        return None
+    
+    if source.format != "JPEG" or source.size != image.size or source.mode != image.mode:
+        source.close()
+        return None
+    return source
+
+
+def encode_image(image: Image.Image, max_size: int = 512) -> str:
+    """
+    Convert PIL Image to a resized base64 string for OpenAI vision models.
+    
+    A JPEG that has not been loaded yet is re-opened from its source and
+    decoded at a reduced scale (no smaller than the target size) before the
+    final resize. The image passed in is never modified.
+    """
+    width, height = image.size
+    if width > max_size or height > max_size:
+        if width > height:
+            new_width = max_size
+            new_height = int(height * (max_size / width))
+        else:
+            new_height = max_size
+            new_width = int(width * (max_size / height))
+        source = _reopen_unloaded_jpeg(image)
+        if source is None:
+            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        else:
+            with source:
+                source.draft(source.mode, (new_width, new_height))
+                image = source.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    buffered = BytesIO()
+    image.save(buffered, format="JPEG", quality=80, optimize=True)
+    # Encode straight from the buffer; base64 output is pure ASCII
+    return base64.b64encode(buffered.getbuffer()).decode("ascii")
@@ -1,12 +1,226 @@
 """
 Analytics Module
 Generates comprehensive analytics with realistic admin metrics.
+
+Aggregates are kept in a rolling snapshot (outputs/analytics_snapshot.json)
+that FeedbackLogger updates on every write, so the dashboard does not have
+to re-scan the full feedback log on each request.
 """
-import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, Optional
 from pathlib import Path
 from collections import Counter
 from datetime import datetime, timedelta
+from functools import lru_cache
+import heapq
+import os
+
+import orjson
+
+from modules.log_store import LOCK_FILENAME, locked, read_jsonl, replay_feedback_log
+
+SNAPSHOT_FILENAME = "analytics_snapshot.json"
+
+# Number of manual interventions kept in the snapshot for the dashboard
+RECENT_INTERVENTIONS_LIMIT = 10
+
+
+@lru_cache(maxsize=4)
+def _load_cached(path: str, file_key: Tuple[int, int]) -> List[Dict[str, Any]]:
+    """
+    Parse a JSON Lines log file.
+    
+    Cached per (path, file_key) so repeated dashboard polls reuse the parsed
+    list until the file changes. Callers must not mutate the returned list.
+    """
+    return read_jsonl(Path(path))
+
+
+def _load_jsonl(path: Path) -> List[Dict[str, Any]]:
+    """Load a JSON Lines log file through the cache, keyed by mtime and size."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return []
+    return _load_cached(str(path), (stat.st_mtime_ns, stat.st_size))
+
+
+def file_key(path: Path) -> List[int]:
+    """
+    Return [mtime_ns, size] identifying the current version of a file.
+    
+    A missing file is reported as [0, 0]; snapshots use None for "unknown".
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return [0, 0]
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def parse_timestamp(ts) -> Optional[datetime]:
+    """Parse timestamp string to datetime."""
+    if not ts or not isinstance(ts, str):
+        return None
+    return _parse_iso_timestamp(ts)
+
+
+@lru_cache(maxsize=65536)
+def _parse_iso_timestamp(ts: str) -> Optional[datetime]:
+    """
+    Parse an ISO timestamp string.
+    
+    Memoized because snapshot rebuilds and incremental updates parse the
+    same timestamp strings repeatedly.
+    """
+    try:
+        # Handle ISO format with or without timezone
+        ts_clean = ts.replace('Z', '+00:00')
+        # Remove microseconds if present for compatibility
+        if '.' in ts_clean and '+' in ts_clean:
+            parts = ts_clean.split('+')
+            if '.' in parts[0]:
+                time_part = parts[0].split('.')[0]
+                ts_clean = f"{time_part}+{parts[1]}"
+        return datetime.fromisoformat(ts_clean)
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def _intervention_sort_key(intervention: Dict[str, Any]) -> Tuple[float, str]:
+    """
+    Order interventions chronologically.
+    
+    Naive timestamps are local time and aware ones (UTC) are converted, so
+    both formats compare correctly. parse_timestamp drops microseconds from
+    aware timestamps, so the raw string breaks ties within a second.
+    """
+    timestamp = intervention.get("timestamp", "")
+    ts = parse_timestamp(timestamp)
+    if ts is None:
+        return (float("-inf"), str(timestamp))
+    return (ts.timestamp(), timestamp)
+
+
+def _intervention(log: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a manually edited log entry for the dashboard."""
+    return {
+        "timestamp": log.get("timestamp", ""),
+        "image": log.get("image_name", log.get("image", "Unknown")),
+        "edit_count": log.get("edit_count", 0)
+    }
+
+
+def _apply_log(snapshot: Dict[str, Any], log: Dict[str, Any], sign: int = 1) -> bool:
+    """
+    Add (sign=1) or remove (sign=-1) one log entry's contribution to the
+    snapshot counters.
+    
+    Returns:
+        Whether the entry has manual edits
+    """
+    has_edits = bool(log.get("has_edits", False))
+    findings = log.get("original_report", {}).get("findings", [])
+    
+    snapshot["total_reports"] += sign
+    snapshot["reports_with_edits"] += sign * has_edits
+    snapshot["total_edits"] += sign * log.get("edit_count", 0)
+    snapshot["total_findings"] += sign * len(findings)
+    for finding in findings:
+        if isinstance(finding, dict) and "confidence" in finding:
+            snapshot["confidence_sum"] += sign * finding["confidence"]
+            snapshot["confidence_count"] += sign
+    
+    ts = parse_timestamp(log.get("timestamp"))
+    if ts:
+        if ts.tzinfo is not None:
+            # Bucket UTC timestamps by local date, like naive (local) ones
+            ts = ts.astimezone()
+        bucket = snapshot["days"].setdefault(ts.date().isoformat(), [0, 0])
+        bucket[0] += sign
+        bucket[1] += sign * has_edits
+    
+    images = snapshot["images"]
+    image = log.get("image_name", log.get("image", ""))
+    images[image] = images.get(image, 0) + sign
+    if images[image] <= 0:
+        del images[image]
+    
+    return has_edits
+
+
+def new_snapshot() -> Dict[str, Any]:
+    """Create an empty analytics snapshot."""
+    return {
+        "feedback_log_key": None,
+        "learning_data_key": None,
+        "total_reports": 0,
+        "reports_with_edits": 0,
+        "total_edits": 0,
+        "total_findings": 0,
+        "confidence_sum": 0.0,
+        "confidence_count": 0,
+        "images": {},  # image name -> number of log entries
+        "days": {},  # ISO date -> [total, manual]
+        "recent_interventions": [],
+        "total_learning_entries": 0
+    }
+
+
+def add_log_to_snapshot(
+    snapshot: Dict[str, Any],
+    log: Dict[str, Any],
+    replaced: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Fold one feedback log entry into the snapshot counters.
+    
+    Args:
+        snapshot: Snapshot to update in place
+        log: Newly written log entry
+        replaced: Entry that ``log`` overwrote in the feedback log, if any
+    """
+    if replaced is not None:
+        _apply_log(snapshot, replaced, sign=-1)
+    
+    if _apply_log(snapshot, log):
+        snapshot["recent_interventions"] = heapq.nlargest(
+            RECENT_INTERVENTIONS_LIMIT,
+            snapshot["recent_interventions"] + [_intervention(log)],
+            key=_intervention_sort_key
+        )
+
+
+def build_snapshot(feedback_logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a snapshot from the full feedback log in a single pass."""
+    snapshot = new_snapshot()
+    interventions = []
+    
+    for log in feedback_logs:
+        if _apply_log(snapshot, log):
+            interventions.append(_intervention(log))
+    
+    snapshot["recent_interventions"] = heapq.nlargest(
+        RECENT_INTERVENTIONS_LIMIT, interventions, key=_intervention_sort_key
+    )
+    return snapshot
+
+
+def load_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a snapshot file, returning None if it is missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, FileNotFoundError):
+        return None
+
+
+def save_snapshot(path: Path, snapshot: Dict[str, Any]) -> None:
+    """Atomically replace the snapshot file."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(
+        orjson.dumps(snapshot, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    )
+    os.replace(tmp_path, path)
 
 
 class AnalyticsEngine:
@@ -14,14 +228,14 @@ class AnalyticsEngine:
     Generates simple analytics reports from feedback logs and learning data.
     """
     
-    def __init__(self, feedback_log_path: str = "outputs/feedback_logs.json",
-                 learning_data_path: str = "outputs/learning_data.json"):
+    def __init__(self, feedback_log_path: str = "outputs/feedback_logs.jsonl",
+                 learning_data_path: str = "outputs/learning_data.jsonl"):
         """
         Initialize the analytics engine.
         
         Args:
-            feedback_log_path: Path to feedback logs JSON file
-            learning_data_path: Path to learning data JSON file
+            feedback_log_path: Path to feedback logs JSON Lines file
+            learning_data_path: Path to learning data JSON Lines file
         """
         # Ensure paths are relative to project root
         if not Path(feedback_log_path).is_absolute():
@@ -33,26 +247,65 @@ class AnalyticsEngine:
         else:
             self.feedback_log_path = Path(feedback_log_path)
             self.learning_data_path = Path(learning_data_path)
+        
+        self.snapshot_path = self.feedback_log_path.parent / SNAPSHOT_FILENAME
+        self.lock_path = self.feedback_log_path.parent / LOCK_FILENAME
     
     def _load_feedback_logs(self) -> List[Dict[str, Any]]:
-        """Load feedback logs."""
-        try:
-            if self.feedback_log_path.exists():
-                with open(self.feedback_log_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            pass
-        return []
+        """Load feedback logs (parsed once until the file changes)."""
+        return replay_feedback_log(_load_jsonl(self.feedback_log_path))
     
     def _load_learning_data(self) -> List[Dict[str, Any]]:
-        """Load learning data."""
-        try:
-            if self.learning_data_path.exists():
-                with open(self.learning_data_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            pass
-        return []
+        """Load learning data (cached until the file changes)."""
+        return _load_jsonl(self.learning_data_path)
+    
+    def _load_snapshot(self) -> Dict[str, Any]:
+        """
+        Load the rolling snapshot, rebuilding any part that no longer matches
+        the files on disk (e.g. logs written before snapshots existed).
+        """
+        snapshot = load_snapshot(self.snapshot_path)
+        if self._snapshot_is_current(snapshot):
+            return snapshot
+        
+        # Rebuild under the writers' lock: a log_feedback append between reading
+        # a file's key and reading its contents would otherwise be saved under
+        # the old key, and the writer would then count that entry a second time
+        with locked(self.lock_path):
+            snapshot = load_snapshot(self.snapshot_path)
+            feedback_key = file_key(self.feedback_log_path)
+            learning_key = file_key(self.learning_data_path)
+            rebuilt = False
+            
+            if snapshot is None or snapshot.get("feedback_log_key") != feedback_key:
+                learning = snapshot or {}
+                snapshot = build_snapshot(self._load_feedback_logs())
+                snapshot["feedback_log_key"] = feedback_key
+                snapshot["learning_data_key"] = learning.get("learning_data_key")
+                snapshot["total_learning_entries"] = learning.get("total_learning_entries", 0)
+                rebuilt = True
+            
+            if snapshot.get("learning_data_key") != learning_key:
+                snapshot["total_learning_entries"] = len(self._load_learning_data())
+                snapshot["learning_data_key"] = learning_key
+                rebuilt = True
+            
+            if rebuilt:
+                try:
+                    save_snapshot(self.snapshot_path, snapshot)
+                except OSError:
+                    # The snapshot is only a cache; it will be rebuilt next time
+                    pass
+        
+        return snapshot
+    
+    def _snapshot_is_current(self, snapshot: Optional[Dict[str, Any]]) -> bool:
+        """Check whether a snapshot matches both files as they are on disk now."""
+        return (
+            snapshot is not None
+            and snapshot.get("feedback_log_key") == file_key(self.feedback_log_path)
+            and snapshot.get("learning_data_key") == file_key(self.learning_data_path)
+        )
     
     def generate_analytics_report(self) -> Dict[str, Any]:
         """
@@ -61,124 +314,66 @@ class AnalyticsEngine:
         Returns:
             Dictionary containing summary statistics
         """
-        feedback_logs = self._load_feedback_logs()
-        learning_data = self._load_learning_data()
+        snapshot = self._load_snapshot()
         
         return {
-            "summary": self._generate_summary(feedback_logs, learning_data),
-            "admin_dashboard": self._generate_admin_dashboard(feedback_logs, learning_data)
+            "summary": self._generate_summary(snapshot),
+            "admin_dashboard": self._generate_admin_dashboard(snapshot)
         }
     
-    def _generate_summary(self, feedback_logs: List[Dict], learning_data: List[Dict]) -> Dict[str, Any]:
+    def _generate_summary(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
         """Generate simple summary statistics."""
-        total_reports = len(feedback_logs)
-        reports_with_edits = sum(1 for log in feedback_logs if log.get("has_edits", False))
-        total_edits = sum(log.get("edit_count", 0) for log in feedback_logs)
-        
-        # Count total findings
-        total_findings = sum(
-            len(log.get("original_report", {}).get("findings", [])) 
-            for log in feedback_logs
-        )
-        
-        # Count unique images
-        unique_images = len(set(log.get("image_name", log.get("image", "")) for log in feedback_logs))
-        
         return {
-            "total_reports": total_reports,
-            "reports_with_edits": reports_with_edits,
-            "total_edits": total_edits,
-            "total_findings": total_findings,
-            "unique_images": unique_images,
-            "total_learning_entries": len(learning_data)
+            "total_reports": snapshot["total_reports"],
+            "reports_with_edits": snapshot["reports_with_edits"],
+            "total_edits": snapshot["total_edits"],
+            "total_findings": snapshot["total_findings"],
+            "unique_images": len(snapshot["images"]),
+            "total_learning_entries": snapshot["total_learning_entries"]
         }
     
-    def _generate_admin_dashboard(self, feedback_logs: List[Dict], learning_data: List[Dict]) -> Dict[str, Any]:
+    def _generate_admin_dashboard(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate comprehensive admin-level dashboard with realistic metrics.
         
+        Period statistics are summed from the snapshot's per-day buckets.
+        
         Returns:
             Dictionary with admin dashboard metrics
         """
-        total_reports = len(feedback_logs)
-        manual_edits = sum(1 for log in feedback_logs if log.get("has_edits", False))
+        total_reports = snapshot["total_reports"]
+        manual_edits = snapshot["reports_with_edits"]
         fully_automated = total_reports - manual_edits
         
         # Calculate rates
         automation_rate = (fully_automated / total_reports * 100) if total_reports > 0 else 0
         manual_intervention_rate = (manual_edits / total_reports * 100) if total_reports > 0 else 0
         
-        # Time-based statistics
+        # Time-based statistics (ISO dates compare lexicographically)
         now = datetime.now()
-        today = now.date()
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
+        today = now.date().isoformat()
+        week_ago = (now.date() - timedelta(days=7)).isoformat()
+        month_ago = (now.date() - timedelta(days=30)).isoformat()
         
-        def parse_timestamp(ts):
-            """Parse timestamp string to datetime."""
-            if not ts:
-                return None
-            try:
-                if isinstance(ts, str):
-                    # Handle ISO format with or without timezone
-                    ts_clean = ts.replace('Z', '+00:00')
-                    # Remove microseconds if present for compatibility
-                    if '.' in ts_clean and '+' in ts_clean:
-                        parts = ts_clean.split('+')
-                        if '.' in parts[0]:
-                            time_part = parts[0].split('.')[0]
-                            ts_clean = f"{time_part}+{parts[1]}"
-                    return datetime.fromisoformat(ts_clean)
-                return None
-            except (ValueError, AttributeError, TypeError):
-                return None
+        today_total = today_manual = 0
+        week_total = week_manual = 0
+        month_total = month_manual = 0
+        for day, (total, manual) in snapshot["days"].items():
+            if day == today:
+                today_total += total
+                today_manual += manual
+            if day >= week_ago:
+                week_total += total
+                week_manual += manual
+            if day >= month_ago:
+                month_total += total
+                month_manual += manual
         
-        # Filter logs by time period
-        today_logs = [
-            log for log in feedback_logs
-            if parse_timestamp(log.get("timestamp")) and 
-            parse_timestamp(log.get("timestamp")).date() == today
-        ]
-        week_logs = [
-            log for log in feedback_logs
-            if parse_timestamp(log.get("timestamp")) and 
-            parse_timestamp(log.get("timestamp")).date() >= week_ago
-        ]
-        month_logs = [
-            log for log in feedback_logs
-            if parse_timestamp(log.get("timestamp")) and 
-            parse_timestamp(log.get("timestamp")).date() >= month_ago
-        ]
-        
-        # Performance metrics
-        total_findings = sum(
-            len(log.get("original_report", {}).get("findings", [])) 
-            for log in feedback_logs
-        )
+        # Performance and quality metrics
+        total_findings = snapshot["total_findings"]
         avg_findings_per_report = total_findings / total_reports if total_reports > 0 else 0
-        
-        # Quality metrics - average confidence
-        all_confidences = []
-        for log in feedback_logs:
-            findings = log.get("original_report", {}).get("findings", [])
-            for finding in findings:
-                if isinstance(finding, dict) and "confidence" in finding:
-                    all_confidences.append(finding["confidence"])
-        
-        avg_confidence = sum(all_confidences) / len(all_confidences) if all_confidences else 0
-        
-        # Manual intervention details
-        manual_interventions = []
-        for log in feedback_logs:
-            if log.get("has_edits", False):
-                manual_interventions.append({
-                    "timestamp": log.get("timestamp", ""),
-                    "image": log.get("image_name", log.get("image", "Unknown")),
-                    "edit_count": log.get("edit_count", 0)
-                })
-        
-        # Sort by timestamp (most recent first)
-        manual_interventions.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        confidence_count = snapshot["confidence_count"]
+        avg_confidence = snapshot["confidence_sum"] / confidence_count if confidence_count else 0
         
         return {
             "operations_breakdown": {
@@ -190,33 +385,34 @@ class AnalyticsEngine:
             },
             "time_period_stats": {
                 "today": {
-                    "total": len(today_logs),
-                    "automated": len([log for log in today_logs if not log.get("has_edits", False)]),
-                    "manual": len([log for log in today_logs if log.get("has_edits", False)])
+                    "total": today_total,
+                    "automated": today_total - today_manual,
+                    "manual": today_manual
                 },
                 "this_week": {
-                    "total": len(week_logs),
-                    "automated": len([log for log in week_logs if not log.get("has_edits", False)]),
-                    "manual": len([log for log in week_logs if log.get("has_edits", False)])
+                    "total": week_total,
+                    "automated": week_total - week_manual,
+                    "manual": week_manual
                 },
                 "this_month": {
-                    "total": len(month_logs),
-                    "automated": len([log for log in month_logs if not log.get("has_edits", False)]),
-                    "manual": len([log for log in month_logs if log.get("has_edits", False)])
+                    "total": month_total,
+                    "automated": month_total - month_manual,
+                    "manual": month_manual
                 }
             },
             "performance_metrics": {
                 "average_findings_per_report": round(avg_findings_per_report, 1),
                 "average_confidence_score": round(avg_confidence * 100, 1),
                 "total_findings_detected": total_findings,
-                "reports_per_day_avg": round(len(week_logs) / 7, 1) if week_logs else 0
+                "reports_per_day_avg": round(week_total / 7, 1) if week_total else 0
             },
             "manual_interventions": {
                 "total_interventions": manual_edits,
                 "average_edits_per_intervention": round(
-                    sum(log.get("edit_count", 0) for log in feedback_logs if log.get("has_edits", False)) / manual_edits,
+                    # Unedited entries always carry edit_count 0
+                    snapshot["total_edits"] / manual_edits,
                     1
                 ) if manual_edits > 0 else 0,
-                "recent_interventions": manual_interventions[:10]  # Most recent 10
+                "recent_interventions": snapshot["recent_interventions"]
             }
         }
@@ -1,5 +1,7 @@
+import hashlib
 import random
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
 LABEL_POOL: List[str] = [
@@ -13,6 +15,14 @@ LABEL_POOL: List[str] = [
     "No Finding"
 ]
 
+# Filename keyword -> simulated labels, checked in order
+KEYWORD_LABELS: Dict[str, List[str]] = {
+    "cardio": ["Cardiomegaly", "Pulmonary Edema"],
+    "pleura": ["Pleural Effusion"],
+    "normal": ["No Finding"],
+    "clear": ["No Finding"],
+}
+
 # Global MIMIC-CXR loader instance (lazy loaded)
 _mimic_loader = None
 
@@ -41,7 +51,10 @@ def simulate_chexpert_labels(image_path: str, use_mimic: bool = True) -> List[st
     Get CheXpert labels for an image.
     
     First tries to load real labels from MIMIC-CXR dataset.
-    Falls back to simulation if MIMIC-CXR data not available.
+    Falls back to simulation if MIMIC-CXR data not available; simulated
+    labels are deterministic per filename.
+    
+    Lookups are memoized, so re-analyzing the same image is O(1).
     
     Args:
         image_path: Path to the image file
@@ -50,6 +63,11 @@ def simulate_chexpert_labels(image_path: str, use_mimic: bool = True) -> List[st
     Returns:
         List of CheXpert labels
     """
+    return list(_lookup_labels(image_path, use_mimic))
+
+@lru_cache(maxsize=4096)
+def _lookup_labels(image_path: str, use_mimic: bool) -> Tuple[str, ...]:
+    """Resolve labels for an image (cached, hence an immutable tuple)."""
     # Try to use MIMIC-CXR dataset if available
     if use_mimic:
         loader = _get_mimic_loader()
@@ -57,16 +75,16 @@ def simulate_chexpert_labels(image_path: str, use_mimic: bool = True) -> List[st
             filename = Path(image_path).name
             labels = loader.get_labels(filename)
             if labels:
-                return labels
+                return tuple(labels)
     
     # Fall back to simulation
     filename = image_path.lower()
 
-    if "cardio" in filename:
-        return ["Cardiomegaly", "Pulmonary Edema"]
-    elif "pleura" in filename:
-        return ["Pleural Effusion"]
-    elif "normal" in filename or "clear" in filename:
-        return ["No Finding"]
-    else:
-        return random.sample(LABEL_POOL[:-1], k=random.randint(2, 4))
+    for keyword, labels in KEYWORD_LABELS.items():
+        if keyword in filename:
+            return tuple(labels)
+
+    # Seed from the filename so the same image always gets the same labels
+    digest = hashlib.blake2b(filename.encode("utf-8"), digest_size=4).digest()
+    rng = random.Random(int.from_bytes(digest, "big"))
+    return tuple(rng.sample(LABEL_POOL[:-1], k=rng.randint(2, 4)))
@@ -2,11 +2,52 @@
 Continuous Learning Module
 Implements rule mining and weak classifier for model improvement over time.
 """
-import json
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Iterable, Iterator
 from pathlib import Path
 from collections import defaultdict, Counter
+from itertools import islice
 import re
+import sys
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Optional: co-occurrences fall back to pure Python
+    njit = None
+
+from modules.log_store import iter_jsonl
+
+# Evidence key terms: words of four or more characters
+_KEY_TERM_RE = re.compile(r'\b\w{4,}\b')
+
+# Largest number of distinct findings handled with a dense co-occurrence matrix
+MAX_DENSE_FINDINGS = 4096
+
+
+def _intern(name: Any) -> Any:
+    """Intern string finding names so repeated names share one object."""
+    return sys.intern(name) if type(name) is str else name
+
+
+def _cooccurrence_matrix(ids: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    """
+    Mark every pair of findings that appear in the same entry.
+    
+    ids holds the finding ids of all entries back to back; entry k spans
+    ids[starts[k]:starts[k + 1]].
+    """
+    adj = np.zeros((n, n), dtype=np.bool_)
+    for k in range(len(starts) - 1):
+        for i in range(starts[k], starts[k + 1]):
+            for j in range(i + 1, starts[k + 1]):
+                adj[ids[i], ids[j]] = True
+                adj[ids[j], ids[i]] = True
+    return adj
+
+
+if njit is not None:
+    _cooccurrence_matrix = njit(cache=True)(_cooccurrence_matrix)
 
 
 class ContinuousLearningEngine:
@@ -14,51 +55,87 @@ class ContinuousLearningEngine:
     Implements continuous learning through rule mining and weak classifier updates.
     """
     
-    def __init__(self, learning_data_path: str = "outputs/learning_data.json"):
+    def __init__(self, learning_data_path: str = "outputs/learning_data.jsonl"):
         """
         Initialize the continuous learning engine.
         
         Args:
-            learning_data_path: Path to learning data JSON file
+            learning_data_path: Path to learning data JSON Lines file
         """
         self.learning_data_path = Path(learning_data_path)
         self.rules = []
         self.patterns = defaultdict(list)
         self.confidence_adjustments = {}
+        
+        # mine_rules() result, valid while the learning data file is unchanged
+        self._rules_cache = None
+        self._rules_cache_key = None
+        
+        # (lowercased pattern, rule) for each confidence adjustment rule
+        self._conf_rules = []
+    
+    def load_learning_data_stream(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield learning data entries one at a time.
+        
+        Only the current line is held in memory, so single-pass consumers
+        work on corpora of any size.
+        """
+        return iter_jsonl(self.learning_data_path)
     
     def load_learning_data(self) -> List[Dict[str, Any]]:
         """Load learning data from file."""
+        return list(self.load_learning_data_stream())
+    
+    def _learning_data_key(self) -> Tuple[int, int]:
+        """Return (mtime_ns, size) of the learning data file, or (0, 0) if missing."""
         try:
-            if self.learning_data_path.exists():
-                with open(self.learning_data_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            pass
-        return []
+            stat = self.learning_data_path.stat()
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_mtime_ns, stat.st_size)
     
     def mine_rules(self, min_support: int = 2) -> List[Dict[str, Any]]:
         """
         Mine rules from feedback data.
         
+        Results are cached until the learning data file changes (by mtime and
+        size), so repeated calls are cheap. Callers must not mutate the list.
+        
         Args:
             min_support: Minimum number of occurrences for a rule to be considered
             
         Returns:
             List of mined rules
         """
-        learning_data = self.load_learning_data()
+        # Stat before reading so a concurrent append invalidates the cache
+        key = (self._learning_data_key(), min_support)
+        if self._rules_cache is not None and key == self._rules_cache_key:
+            return self._rules_cache
+        
+        self.rules = self._mine_rules(min_support)
+        self._conf_rules = [
+            (rule["pattern"].lower(), rule)
+            for rule in self.rules
+            if rule["type"] == "confidence_adjustment"
+        ]
+        self._rules_cache = self.rules
+        self._rules_cache_key = key
+        return self.rules
+    
+    def _mine_rules(self, min_support: int) -> List[Dict[str, Any]]:
+        """Mine rules from the learning data file, bypassing the cache."""
+        patterns = self._extract_all(self.load_learning_data_stream())
         
-        if not learning_data:
+        if not patterns["total_entries"]:
             return []
         
-        # Extract edit patterns
-        edit_patterns = self._extract_edit_patterns(learning_data)
-        
-        # Extract confidence patterns
-        confidence_patterns = self._extract_confidence_patterns(learning_data)
-        
-        # Extract finding patterns
-        finding_patterns = self._extract_finding_patterns(learning_data)
+        edit_patterns = patterns["edit_patterns"]
+        confidence_patterns = patterns["confidence_patterns"]
+        finding_patterns = patterns["finding_patterns"]
+        edit_pattern_entries = patterns["edit_pattern_entries"]
+        finding_name_entries = patterns["finding_name_entries"]
+        total_with_edits = patterns["total_with_edits"]
         
         # Combine into rules
         rules = []
@@ -70,7 +147,7 @@ class ContinuousLearningEngine:
                     "type": "edit_pattern",
                     "pattern": pattern,
                     "support": count,
-                    "confidence": self._calculate_rule_confidence(pattern, learning_data)
+                    "confidence": self._calculate_rule_confidence(pattern, edit_pattern_entries, total_with_edits)
                 })
         
         # Rule: Confidence adjustments
@@ -80,7 +157,7 @@ class ContinuousLearningEngine:
                     "type": "confidence_adjustment",
                     "pattern": pattern,
                     "adjustment": round(adjustment, 2),
-                    "support": self._count_pattern_occurrences(pattern, learning_data)
+                    "support": finding_name_entries.get(pattern, 0)
                 })
         
         # Rule: Finding associations
@@ -93,68 +170,140 @@ class ContinuousLearningEngine:
                     "support": len(associations)
                 })
         
-        self.rules = sorted(rules, key=lambda x: x.get("support", 0), reverse=True)
-        return self.rules
+        return sorted(rules, key=lambda x: x.get("support", 0), reverse=True)
     
-    def _extract_edit_patterns(self, learning_data: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _extract_all(self, learning_data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Extract common edit patterns from learning data.
+        Extract all rule-mining patterns in a single pass over the learning data.
+        
+        Returns:
+            Dictionary with edit_patterns (pattern -> occurrences),
+            confidence_patterns (finding -> average adjustment),
+            finding_patterns (finding -> co-occurring findings),
+            edit_pattern_entries and finding_name_entries (pattern -> number of
+            entries it appears in), total_with_edits and total_entries
         """
-        patterns = Counter()
+        edit_patterns = Counter()
+        edit_pattern_entries = Counter()
+        finding_name_entries = Counter()
+        total_with_edits = 0
+        total_entries = 0
+        
+        # Flat arrays of (finding id, original confidence, edited confidence)
+        name_ids = {}
+        ids = []
+        orig_confs = []
+        edit_confs = []
+        
+        # Finding names of entries with at least two findings, for co-occurrences
+        entry_names = []
+        
+        # Bound once: these run for every finding of every entry
+        get = dict.get
+        name_id = name_ids.setdefault
+        add_id = ids.append
+        add_orig_conf = orig_confs.append
+        add_edit_conf = edit_confs.append
         
         for entry in learning_data:
-            if not entry.get("has_edits", False):
-                continue
+            total_entries += 1
+            original = get(entry, "original_findings", ())
+            edited = get(entry, "edited_findings", ())
+            has_edits = get(entry, "has_edits", False)
             
-            original = entry.get("original_findings", [])
-            edited = entry.get("edited_findings", [])
+            # Names from parsed JSON are fresh strings; intern them once per entry
+            orig_names = [_intern(get(f, "finding", "")) for f in original]
+            edit_names = [_intern(get(f, "finding", "")) for f in edited]
+            finding_name_entries.update(set(orig_names).union(edit_names))
             
-            # Find what was changed
-            for orig_f, edit_f in zip(original, edited):
-                if orig_f != edit_f:
+            changed = set()
+            for orig_f, edit_f, finding_name, edit_name in zip(original, edited, orig_names, edit_names):
+                add_id(name_id(finding_name, len(name_ids)))
+                add_orig_conf(get(orig_f, "confidence", 0.5))
+                add_edit_conf(get(edit_f, "confidence", 0.5))
+                
+                if has_edits and orig_f != edit_f:
                     # Pattern: original -> edited
-                    pattern = f"{orig_f.get('finding', '')} -> {edit_f.get('finding', '')}"
-                    patterns[pattern] += 1
+                    pattern = f"{finding_name} -> {edit_name}"
+                    edit_patterns[pattern] += 1
+                    changed.add(pattern)
+            
+            if has_edits:
+                total_with_edits += 1
+                edit_pattern_entries.update(changed)
+            
+            finding_names = [name for name in orig_names if name]
+            if len(finding_names) > 1:
+                entry_names.append(finding_names)
         
-        return dict(patterns)
+        return {
+            "edit_patterns": dict(edit_patterns),
+            "confidence_patterns": self._average_adjustments(name_ids, ids, orig_confs, edit_confs),
+            "finding_patterns": self._associate_findings(entry_names),
+            "edit_pattern_entries": edit_pattern_entries,
+            "finding_name_entries": finding_name_entries,
+            "total_with_edits": total_with_edits,
+            "total_entries": total_entries
+        }
     
-    def _extract_confidence_patterns(self, learning_data: List[Dict[str, Any]]) -> Dict[str, float]:
+    def _average_adjustments(
+        self,
+        name_ids: Dict[str, int],
+        ids: List[int],
+        orig_confs: List[float],
+        edit_confs: List[float]
+    ) -> Dict[str, float]:
         """
-        Extract patterns in confidence adjustments.
+        Average the significant confidence adjustments per finding.
         """
-        adjustments = defaultdict(list)
+        if not ids:
+            return {}
         
-        for entry in learning_data:
-            original = entry.get("original_findings", [])
-            edited = entry.get("edited_findings", [])
-            explanations = entry.get("explanations", [])
-            
-            for orig_f, edit_f in zip(original, edited):
-                finding_name = orig_f.get("finding", "")
-                orig_conf = orig_f.get("confidence", 0.5)
-                edit_conf = edit_f.get("confidence", 0.5)
-                
-                if abs(orig_conf - edit_conf) > 0.1:
-                    adjustment = edit_conf - orig_conf
-                    adjustments[finding_name] = adjustments[finding_name] + [adjustment]
+        ids = np.asarray(ids, dtype=np.intp)
+        diffs = np.asarray(edit_confs, dtype=np.float64) - np.asarray(orig_confs, dtype=np.float64)
+        significant = np.abs(diffs) > 0.1
+        ids = ids[significant]
         
-        # Average adjustments
-        avg_adjustments = {}
-        for pattern, values in adjustments.items():
-            avg_adjustments[pattern] = sum(values) / len(values)
+        # Average adjustments per finding
+        sums = np.bincount(ids, weights=diffs[significant], minlength=len(name_ids))
+        counts = np.bincount(ids, minlength=len(name_ids))
+        names = list(name_ids)
         
-        return avg_adjustments
+        # Keep findings in order of their first significant adjustment
+        return {
+            names[i]: float(sums[i] / counts[i])
+            for i in dict.fromkeys(ids.tolist())
+        }
     
-    def _extract_finding_patterns(self, learning_data: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    def _associate_findings(self, entry_names: List[List[str]]) -> Dict[str, List[str]]:
         """
-        Extract patterns in finding associations.
+        Map each finding to the findings it co-occurs with in some entry.
         """
+        if njit is not None and entry_names:
+            # Ids in order of first appearance keep the output order of the Python path
+            name_ids = {}
+            for finding_names in entry_names:
+                for name in finding_names:
+                    name_ids.setdefault(name, len(name_ids))
+            
+            if len(name_ids) <= MAX_DENSE_FINDINGS:
+                ids = np.fromiter(
+                    (name_ids[name] for finding_names in entry_names for name in finding_names),
+                    dtype=np.int64
+                )
+                starts = np.zeros(len(entry_names) + 1, dtype=np.int64)
+                np.cumsum([len(finding_names) for finding_names in entry_names], out=starts[1:])
+                adj = _cooccurrence_matrix(ids, starts, len(name_ids))
+                
+                names = list(name_ids)
+                return {
+                    name: [names[j] for j in np.flatnonzero(adj[i])]
+                    for name, i in name_ids.items()
+                }
+        
         associations = defaultdict(set)
         
-        for entry in learning_data:
-            findings = entry.get("original_findings", [])
-            finding_names = [f.get("finding", "") for f in findings if f.get("finding")]
-            
+        for finding_names in entry_names:
             # Find co-occurrences
             for i, name1 in enumerate(finding_names):
                 for name2 in finding_names[i+1:]:
@@ -163,26 +312,15 @@ class ContinuousLearningEngine:
         
         return {k: list(v) for k, v in associations.items()}
     
-    def _calculate_rule_confidence(self, pattern: str, learning_data: List[Dict[str, Any]]) -> float:
+    def _calculate_rule_confidence(self, pattern: str, edit_pattern_entries: Counter, total_with_edits: int) -> float:
         """
         Calculate confidence for a rule pattern.
         """
         # Simple confidence calculation based on frequency
-        pattern_count = self._count_pattern_occurrences(pattern, learning_data)
-        total_entries = len([e for e in learning_data if e.get("has_edits", False)])
-        
-        if total_entries == 0:
+        if total_with_edits == 0:
             return 0.0
         
-        return round(pattern_count / total_entries, 2)
-    
-    def _count_pattern_occurrences(self, pattern: str, learning_data: List[Dict[str, Any]]) -> int:
-        """Count occurrences of a pattern in learning data."""
-        count = 0
-        for entry in learning_data:
-            if pattern in str(entry):
-                count += 1
-        return count
+        return round(edit_pattern_entries.get(pattern, 0) / total_with_edits, 2)
     
     def apply_rules_to_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -192,45 +330,43 @@ class ContinuousLearningEngine:
             report: Original report dictionary
             
         Returns:
-            Improved report with rules applied
+            Improved report with rules applied. Findings no rule adjusts are
+            shared with the input report rather than copied.
         """
-        if not self.rules:
-            self.mine_rules()
+        # Cached; re-mined only when new learning data has been written
+        self.mine_rules()
         
         improved_report = report.copy()
         improved_findings = []
+        applied_rules = set()
         
         for finding in report.get("findings", []):
-            improved_finding = finding.copy()
+            improved_finding = finding
             
             # Apply confidence adjustments
-            finding_name = finding.get("finding", "")
-            for rule in self.rules:
-                if rule["type"] == "confidence_adjustment":
-                    if finding_name.lower() in rule["pattern"].lower():
-                        current_conf = improved_finding.get("confidence", 0.5)
-                        adjustment = rule.get("adjustment", 0)
-                        new_conf = max(0.0, min(1.0, current_conf + adjustment))
-                        improved_finding["confidence"] = round(new_conf, 2)
-                        improved_finding["confidence_adjusted"] = True
-                        improved_finding["adjustment_reason"] = f"Based on learned pattern: {rule['pattern']}"
+            finding_lower = finding.get("finding", "").lower()
+            for pattern_lower, rule in self._conf_rules:
+                if finding_lower in pattern_lower:
+                    if improved_finding is finding:
+                        improved_finding = finding.copy()
+                    current_conf = improved_finding.get("confidence", 0.5)
+                    adjustment = rule.get("adjustment", 0)
+                    new_conf = max(0.0, min(1.0, current_conf + adjustment))
+                    improved_finding["confidence"] = round(new_conf, 2)
+                    improved_finding["confidence_adjusted"] = True
+                    improved_finding["adjustment_reason"] = f"Based on learned pattern: {rule['pattern']}"
+                
+                # A rule counts as applied when its pattern occurs in a finding name
+                if pattern_lower in finding_lower:
+                    applied_rules.add(id(rule))
             
             improved_findings.append(improved_finding)
         
         improved_report["findings"] = improved_findings
-        improved_report["rules_applied"] = len([r for r in self.rules if self._rule_applies(report, r)])
+        improved_report["rules_applied"] = len(applied_rules)
         
         return improved_report
     
-    def _rule_applies(self, report: Dict[str, Any], rule: Dict[str, Any]) -> bool:
-        """Check if a rule applies to a report."""
-        if rule["type"] == "confidence_adjustment":
-            findings = report.get("findings", [])
-            for finding in findings:
-                if rule["pattern"].lower() in finding.get("finding", "").lower():
-                    return True
-        return False
-    
     def train_weak_classifier(self, learning_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Train a weak classifier based on feedback patterns.
@@ -249,18 +385,22 @@ class ContinuousLearningEngine:
         }
         
         # Analyze confidence patterns
-        confidence_by_finding = defaultdict(list)
+        name_ids = {}
+        ids = []
+        confidences = []
         for entry in learning_data:
             findings = entry.get("original_findings", [])
             for finding in findings:
-                finding_name = finding.get("finding", "")
-                confidence = finding.get("confidence", 0.5)
-                confidence_by_finding[finding_name].append(confidence)
+                finding_name = _intern(finding.get("finding", ""))
+                ids.append(name_ids.setdefault(finding_name, len(name_ids)))
+                confidences.append(finding.get("confidence", 0.5))
         
         # Calculate average confidence per finding
-        for finding_name, confidences in confidence_by_finding.items():
-            avg_conf = sum(confidences) / len(confidences)
-            classifier["confidence_thresholds"][finding_name] = round(avg_conf, 2)
+        if ids:
+            sums = np.bincount(ids, weights=np.asarray(confidences, dtype=np.float64), minlength=len(name_ids))
+            counts = np.bincount(ids, minlength=len(name_ids))
+            for finding_name, i in name_ids.items():
+                classifier["confidence_thresholds"][finding_name] = round(float(sums[i] / counts[i]), 2)
         
         # Analyze evidence patterns
         evidence_patterns = defaultdict(int)
@@ -268,10 +408,9 @@ class ContinuousLearningEngine:
             findings = entry.get("original_findings", [])
             for finding in findings:
                 evidence = finding.get("evidence", "").lower()
-                # Extract key terms
-                key_terms = re.findall(r'\b\w{4,}\b', evidence)
-                for term in key_terms[:5]:  # Top 5 terms
-                    evidence_patterns[term] += 1
+                # Extract key terms (first 5 matches only)
+                for match in islice(_KEY_TERM_RE.finditer(evidence), 5):
+                    evidence_patterns[match.group()] += 1
         
         # Weight evidence terms by frequency
         total = sum(evidence_patterns.values())
@@ -285,17 +424,24 @@ class ContinuousLearningEngine:
         """
         Get statistics about the learning process.
         """
-        learning_data = self.load_learning_data()
         rules = self.mine_rules()
         
+        # Count entries in a streaming pass instead of loading the whole file
+        total_entries = 0
+        entries_with_edits = 0
+        for entry in self.load_learning_data_stream():
+            total_entries += 1
+            if entry.get("has_edits", False):
+                entries_with_edits += 1
+        
         return {
-            "total_learning_entries": len(learning_data),
+            "total_learning_entries": total_entries,
             "total_rules_mined": len(rules),
             "rules_by_type": {
                 rule_type: len([r for r in rules if r["type"] == rule_type])
                 for rule_type in ["edit_pattern", "confidence_adjustment", "finding_association"]
             },
             "high_confidence_rules": len([r for r in rules if r.get("confidence", 0) >= 0.7]),
-            "entries_with_edits": len([e for e in learning_data if e.get("has_edits", False)])
+            "entries_with_edits": entries_with_edits
         }
 
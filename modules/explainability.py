@@ -2,8 +2,52 @@
 Explainability Module
 Provides finding → evidence → confidence explanations for AI-generated reports.
 """
+from functools import lru_cache
 from typing import Dict, List, Any, Tuple
 import json
+import re
+
+import numpy as np
+
+# Common radiological phrases reported as key evidence, in output order
+KEY_PHRASES = (
+    "increased", "decreased", "enlarged", "opacity", "effusion",
+    "consolidation", "atelectasis", "pneumothorax", "edema",
+    "cardiomegaly", "blunting", "collapse", "device"
+)
+
+# Finds every phrase occurrence in a single scan; the lookahead lets matches overlap
+_KEY_PHRASE_RE = re.compile("(?=(" + "|".join(map(re.escape, KEY_PHRASES)) + "))")
+
+
+@lru_cache(maxsize=4096)
+def _key_phrases_in(evidence: str) -> Tuple[str, ...]:
+    """
+    Key phrases found in the evidence text, in KEY_PHRASES order, at most 5.
+    
+    Cached because the same evidence strings recur across re-renders and
+    similar reports.
+    """
+    present = {match.group(1) for match in _KEY_PHRASE_RE.finditer(evidence.lower())}
+    return tuple(phrase for phrase in KEY_PHRASES if phrase in present)[:5]
+
+
+def _top_k_indices(values: np.ndarray, k: int) -> List[int]:
+    """
+    Indices of the k largest values, highest first, earlier index first on ties.
+    
+    Equivalent to a stable descending sort truncated to k, in O(n).
+    """
+    n = len(values)
+    k = min(k, n)
+    if k == 0:
+        return []
+    
+    kth = np.partition(values, n - k)[n - k]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    top = np.concatenate((above, ties))
+    return top[np.lexsort((top, -values[top]))].tolist()
 
 
 class ExplainabilityEngine:
@@ -145,25 +189,21 @@ class ExplainabilityEngine:
         if not evidence:
             return []
         
-        # Simple extraction - look for common radiological phrases
-        key_phrases = [
-            "increased", "decreased", "enlarged", "opacity", "effusion",
-            "consolidation", "atelectasis", "pneumothorax", "edema",
-            "cardiomegaly", "blunting", "collapse", "device"
-        ]
-        
-        evidence_lower = evidence.lower()
-        found_phrases = [phrase for phrase in key_phrases if phrase in evidence_lower]
-        
-        return found_phrases[:5]  # Return top 5 key phrases
+        # Simple extraction - look for common radiological phrases (top 5)
+        return list(_key_phrases_in(evidence))
     
     def generate_summary_explanation(self, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Generate an overall explanation summary for all findings.
         """
         total_findings = len(findings)
-        high_confidence_count = sum(1 for f in findings if f.get("confidence", 0) >= 0.7)
-        avg_confidence = sum(f.get("confidence", 0) for f in findings) / total_findings if total_findings > 0 else 0
+        confidences = np.fromiter(
+            (f.get("confidence", 0) for f in findings), dtype=np.float64, count=total_findings
+        )
+        high_confidence_count = int(np.count_nonzero(confidences >= 0.7))
+        # cumsum adds left to right like sum(); mean() would sum pairwise and can
+        # round differently at the 2-decimal boundary
+        avg_confidence = float(np.cumsum(confidences)[-1] / total_findings) if total_findings > 0 else 0
         
         summary = {
             "total_findings": total_findings,
@@ -172,11 +212,11 @@ class ExplainabilityEngine:
             "overall_reliability": "high" if avg_confidence >= 0.7 else "medium" if avg_confidence >= 0.4 else "low",
             "key_findings": [
                 {
-                    "finding": f.get("finding", ""),
-                    "confidence": f.get("confidence", 0),
-                    "location": f.get("location", "")
+                    "finding": findings[i].get("finding", ""),
+                    "confidence": findings[i].get("confidence", 0),
+                    "location": findings[i].get("location", "")
                 }
-                for f in sorted(findings, key=lambda x: x.get("confidence", 0), reverse=True)[:3]
+                for i in _top_k_indices(confidences, 3)
             ]
         }
         
@@ -2,12 +2,38 @@
 Enhanced Feedback Logger Module
 Logs original reports, edited reports, explanations, and user feedback for continuous learning.
 """
-import json
 import os
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 
+import orjson
+
+from modules.analytics import (
+    SNAPSHOT_FILENAME,
+    add_log_to_snapshot,
+    build_snapshot,
+    file_key,
+    load_snapshot,
+    save_snapshot,
+)
+from modules.log_store import (
+    LOCK_FILENAME,
+    append_jsonl,
+    load_feedback_log,
+    locked,
+    migrate_json_array,
+    read_jsonl,
+)
+
+
+def format_timestamp(ts_ns: int) -> str:
+    """Format a time.time_ns() value as a UTC ISO 8601 string with microseconds."""
+    seconds, nanos = divmod(ts_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=nanos // 1000).isoformat()
+
+
 
 class FeedbackLogger:
     """
@@ -31,8 +57,25 @@ class FeedbackLogger:
             self.log_dir = Path(log_dir)
         
         self.log_dir.mkdir(parents=True, exist_ok=True)
-        self.feedback_log_path = self.log_dir / "feedback_logs.json"
-        self.learning_data_path = self.log_dir / "learning_data.json"
+        self.feedback_log_path = self.log_dir / "feedback_logs.jsonl"
+        self.learning_data_path = self.log_dir / "learning_data.jsonl"
+        self.snapshot_path = self.log_dir / SNAPSHOT_FILENAME
+        self.lock_path = self.log_dir / LOCK_FILENAME
+        
+        # Index of each image's pending (unedited) entry, built from the log up to
+        # _log_offset and caught up with entries appended since (by any process)
+        self._pending = {}
+        self._log_offset = 0
+        self._log_inode = None
+        
+        # Carry over logs written in the old JSON array format
+        with self._locked():
+            migrate_json_array(self.log_dir / "feedback_logs.json", self.feedback_log_path)
+            migrate_json_array(self.log_dir / "learning_data.json", self.learning_data_path)
+    
+    def _locked(self):
+        """Hold the lock shared by every writer and snapshot rebuild."""
+        return locked(self.lock_path)
     
     def log_feedback(
         self,
@@ -59,10 +102,13 @@ class FeedbackLogger:
         Returns:
             Dictionary with logged entry information
         """
-        timestamp = datetime.now().isoformat()
+        # ts_ns is an integer for cheap ordering; timestamp is the readable form
+        ts_ns = time.time_ns()
+        timestamp = format_timestamp(ts_ns)
         
         entry = {
             "timestamp": timestamp,
+            "ts_ns": ts_ns,
             "image": image_name,
             "original_report": original_report,
             "edited_report": edited_report,
@@ -74,34 +120,66 @@ class FeedbackLogger:
             "edit_count": self._count_edits(original_report, edited_report) if edited_report else 0
         }
         
-        # Load existing logs
-        logs = self._load_logs()
-        
-        # Check if this is an update to an existing entry (same image, recent timestamp)
-        # Update existing entry if it exists and was created recently (within last hour)
-        existing_entry_index = None
-        for i, existing_log in enumerate(logs):
-            if existing_log.get("image") == image_name:
-                # Check if this is a recent entry (within last hour) without edits
-                if not existing_log.get("has_edits", False):
-                    existing_entry_index = i
-                    break
-        
-        if existing_entry_index is not None:
-            # Update existing entry instead of creating duplicate
-            logs[existing_entry_index] = entry
-        else:
-            # Create new entry
-            logs.append(entry)
-        
-        # Save logs
-        self._save_logs(logs)
-        
-        # Also save to learning data for continuous learning
-        self._save_learning_data(entry)
+        with self._locked():
+            feedback_key = file_key(self.feedback_log_path)
+            learning_key = file_key(self.learning_data_path)
+            
+            # A pending (unedited) entry for the same image is superseded by this
+            # one; readers replay the log to apply the replacement
+            replaced = self._find_pending_entry(image_name)
+            
+            # Append to the log
+            self._append_log(entry)
+            
+            # Also save to learning data for continuous learning
+            learning_saved = False
+            try:
+                self._save_learning_data(entry)
+                learning_saved = True
+            finally:
+                self._update_analytics_snapshot(
+                    entry, replaced, feedback_key, learning_key, learning_saved
+                )
         
         return entry
     
+    def _update_analytics_snapshot(
+        self,
+        entry: Dict[str, Any],
+        replaced: Optional[Dict[str, Any]],
+        feedback_key: List[int],
+        learning_key: List[int],
+        learning_saved: bool
+    ):
+        """
+        Fold a newly written entry into the rolling analytics snapshot.
+        
+        The snapshot is updated incrementally when it matches the files as
+        they were before this write, and rebuilt from the full log otherwise.
+        Failures are ignored: AnalyticsEngine rebuilds stale snapshots.
+        """
+        try:
+            snapshot = load_snapshot(self.snapshot_path)
+            if snapshot is not None and snapshot.get("feedback_log_key") == feedback_key:
+                add_log_to_snapshot(snapshot, entry, replaced)
+            else:
+                previous = snapshot or {}
+                snapshot = build_snapshot(self._load_logs())
+                snapshot["learning_data_key"] = previous.get("learning_data_key")
+                snapshot["total_learning_entries"] = previous.get("total_learning_entries", 0)
+            snapshot["feedback_log_key"] = file_key(self.feedback_log_path)
+            
+            if snapshot.get("learning_data_key") == learning_key:
+                snapshot["total_learning_entries"] += learning_saved
+                snapshot["learning_data_key"] = file_key(self.learning_data_path)
+            else:
+                # Unknown baseline; AnalyticsEngine will recount
+                snapshot["learning_data_key"] = None
+            
+            save_snapshot(self.snapshot_path, snapshot)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    
     def _count_edits(self, original: Dict[str, Any], edited: Dict[str, Any]) -> int:
         """
         Count the number of edits made to the report.
@@ -131,21 +209,48 @@ class FeedbackLogger:
         return edit_count
     
     def _load_logs(self) -> List[Dict[str, Any]]:
-        """Load existing feedback logs."""
+        """Load existing feedback logs, with superseded entries replaced."""
+        return load_feedback_log(self.feedback_log_path)
+    
+    def _find_pending_entry(self, image_name: str) -> Optional[Dict[str, Any]]:
+        """Return the current unedited entry for an image, if there is one."""
+        self._refresh_pending_index()
+        return self._pending.get(image_name)
+    
+    def _refresh_pending_index(self):
+        """Fold log lines written since the last refresh into the pending index."""
         try:
-            if self.feedback_log_path.exists():
-                with open(self.feedback_log_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            pass
-        return []
+            stat = self.feedback_log_path.stat()
+        except FileNotFoundError:
+            self._pending, self._log_offset, self._log_inode = {}, 0, None
+            return
+        
+        if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            # New or rewritten file: index it from the start
+            self._pending, self._log_offset, self._log_inode = {}, 0, stat.st_ino
+        if stat.st_size == self._log_offset:
+            return
+        
+        pending = self._pending
+        with open(self.feedback_log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                self._log_offset += len(line)
+                try:
+                    log = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                # An edited entry replaces the pending one without becoming pending
+                if log.get("has_edits", False):
+                    pending.pop(log.get("image"), None)
+                else:
+                    pending[log.get("image")] = log
     
-    def _save_logs(self, logs: List[Dict[str, Any]]):
-        """Save feedback logs."""
+    def _append_log(self, entry: Dict[str, Any]):
+        """Append an entry to the feedback log."""
         try:
-            with open(self.feedback_log_path, "w", encoding="utf-8") as f:
-                json.dump(logs, f, indent=2, ensure_ascii=False)
-        except (OSError, json.JSONEncodeError) as e:
+            append_jsonl(self.feedback_log_path, entry)
+        except (OSError, orjson.JSONEncodeError) as e:
             raise RuntimeError(f"Failed to write feedback log file: {e}") from e
     
     def _save_learning_data(self, entry: Dict[str, Any]):
@@ -154,9 +259,10 @@ class FeedbackLogger:
         """
         learning_entry = {
             "timestamp": entry["timestamp"],
+            "ts_ns": entry["ts_ns"],
             "image": entry["image"],
             "original_findings": entry["original_report"].get("findings", []),
-            "edited_findings": entry.get("edited_report", {}).get("findings", []),
+            "edited_findings": (entry.get("edited_report") or {}).get("findings", []),
             "explanations": entry.get("explanations", []),
             "user_feedback": entry.get("user_feedback", {}),
             "ontology_mapping": entry.get("ontology_mapping", {}),
@@ -164,26 +270,15 @@ class FeedbackLogger:
             "edit_count": entry.get("edit_count", 0)
         }
         
-        # Load existing learning data
-        learning_data = self._load_learning_data()
-        learning_data.append(learning_entry)
-        
-        # Save learning data
+        # Append to learning data
         try:
-            with open(self.learning_data_path, "w", encoding="utf-8") as f:
-                json.dump(learning_data, f, indent=2, ensure_ascii=False)
-        except (OSError, json.JSONEncodeError) as e:
+            append_jsonl(self.learning_data_path, learning_entry)
+        except (OSError, orjson.JSONEncodeError) as e:
             raise RuntimeError(f"Failed to write learning data file: {e}") from e
     
     def _load_learning_data(self) -> List[Dict[str, Any]]:
         """Load existing learning data."""
-        try:
-            if self.learning_data_path.exists():
-                with open(self.learning_data_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            pass
-        return []
+        return read_jsonl(self.learning_data_path)
     
     def get_feedback_statistics(self) -> Dict[str, Any]:
         """
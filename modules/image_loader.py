@@ -1,14 +1,46 @@
 from PIL import Image
-import base64
 from io import BytesIO
 from pathlib import Path
+from typing import Optional, Tuple
 
-def load_image(path: str) -> Image.Image:
+import numpy as np
+
+try:
+    import pybase64 as base64
+except ImportError:  # Optional: SIMD encoder, falls back to the stdlib
+    import base64
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbojpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # Optional: package or libturbojpeg missing
+    _turbojpeg = None
+
+# JPEG quality used by both the libjpeg-turbo and PIL encoders
+JPEG_QUALITY = 85
+
+# Model inputs are no larger than this, so bigger images are downscaled on load
+MAX_IMAGE_SIZE = (1024, 1024)
+
+def _open_downscaled(img: Image.Image, max_size: Optional[Tuple[int, int]]) -> Image.Image:
+    """Decode an opened image to RGB, no larger than max_size if given."""
+    if max_size is None:
+        return img.convert("RGB")
+    
+    # For JPEGs, draft() lets libjpeg decode at 1/2, 1/4 or 1/8 scale
+    img.draft("RGB", max_size)
+    img = img.convert("RGB")
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return img
+
+def load_image(path: str, max_size: Optional[Tuple[int, int]] = MAX_IMAGE_SIZE) -> Image.Image:
     """
     Load an image from a file path.
     
     Args:
         path: Path to the image file
+        max_size: Bounding box to downscale the image into, preserving aspect
+            ratio; None keeps the full resolution
         
     Returns:
         PIL Image object in RGB mode
@@ -22,10 +54,57 @@ def load_image(path: str) -> Image.Image:
         raise FileNotFoundError(f"Image file not found: {path}")
     
     try:
-        return Image.open(path).convert("RGB")
+        return _open_downscaled(Image.open(path), max_size)
+    except Exception as e:
+        raise ValueError(f"Failed to load image from {path}: {e}") from e
+
+def load_image_for_model(path: str) -> bytes:
+    """
+    Load an image file as JPEG bytes, ready to be base64-encoded for the model.
+    
+    RGB (YCbCr) JPEG files within MAX_IMAGE_SIZE are returned as-is without
+    being decoded; anything else is decoded to RGB, downscaled to fit
+    MAX_IMAGE_SIZE and re-encoded as JPEG.
+    
+    Args:
+        path: Path to the image file
+        
+    Returns:
+        JPEG-encoded image bytes
+        
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file is not a valid image
+    """
+    path_obj = Path(path)
+    if not path_obj.exists():
+        raise FileNotFoundError(f"Image file not found: {path}")
+    
+    try:
+        # Image.open only parses the header; pixels are decoded on demand
+        with Image.open(path_obj) as img:
+            max_width, max_height = MAX_IMAGE_SIZE
+            if (img.format == "JPEG" and img.mode == "RGB"
+                    and img.width <= max_width and img.height <= max_height):
+                return path_obj.read_bytes()
+            return _encode_jpeg(_open_downscaled(img, MAX_IMAGE_SIZE))
     except Exception as e:
         raise ValueError(f"Failed to load image from {path}: {e}") from e
 
+def _encode_jpeg(img: Image.Image) -> bytes:
+    """
+    Encode a PIL Image as JPEG bytes.
+    
+    RGB images are encoded with libjpeg-turbo when PyTurboJPEG is installed,
+    otherwise with PIL.
+    """
+    if _turbojpeg is not None and img.mode == "RGB":
+        return _turbojpeg.encode(np.asarray(img), quality=JPEG_QUALITY, pixel_format=TJPF_RGB)
+    
+    buffered = BytesIO()
+    img.save(buffered, format="JPEG", quality=JPEG_QUALITY, optimize=False, progressive=False)
+    return buffered.getvalue()
+
 def encode_image_to_base64(img: Image.Image) -> str:
     """
     Encode a PIL Image to base64 string.
@@ -40,8 +119,6 @@ def encode_image_to_base64(img: Image.Image) -> str:
         ValueError: If the image cannot be encoded
     """
     try:
-        buffered = BytesIO()
-        img.save(buffered, format="JPEG")
-        return base64.b64encode(buffered.getvalue()).decode()
+        return base64.b64encode(_encode_jpeg(img)).decode("ascii")
     except Exception as e:
         raise ValueError(f"Failed to encode image to base64: {e}") from e
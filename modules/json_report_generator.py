@@ -2,65 +2,25 @@
 JSON Report Generator Module
 Generates structured radiology reports in JSON format with findings, evidence, and confidence scores.
 """
-import json
-import base64
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Optional, Callable, Dict, List, Any
-from PIL import Image
-
-
-def encode_image(image: Image.Image, max_size: int = 512) -> str:
-    """
-    Convert PIL Image to a resized base64 string for OpenAI vision models.
-    """
-    width, height = image.size
-    if width > max_size or height > max_size:
-        if width > height:
-            new_width = max_size
-            new_height = int(height * (max_size / width))
-        else:
-            new_height = max_size
-            new_width = int(width * (max_size / height))
-        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-    buffered = BytesIO()
-    image.save(buffered, format="JPEG", quality=80, optimize=True)
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
 
+import orjson
+from PIL import Image
 
-def generate_json_report(
-    image: Image.Image,
-    api_key: str,
-    model_name: str = "gpt-4o",
-    temperature: float = 0.2,
-    max_tokens: int = 2048,
-    progress_callback: Optional[Callable[[str], None]] = None,
-) -> Dict[str, Any]:
-    """
-    Generate a structured radiology report in JSON format using OpenAI GPT model with vision support.
-    
-    Returns a dictionary with:
-    - findings: List of findings with evidence and confidence
-    - impression: Overall clinical impression
-    - recommendations: Clinical recommendations
-    - metadata: Report metadata
-    """
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY is required to generate a radiology report.")
-
-    try:
-        from openai import OpenAI, OpenAIError, RateLimitError
-    except ImportError as exc:
-        raise ImportError("OpenAI library not installed. Run: pip install openai") from exc
+# Image encoding lives in one shared module; encode_image stays importable from here
+from modules._image_encoding import encode_image
+from modules.openai_client import get_async_client, get_client
 
-    img_b64 = encode_image(image)
-    client = OpenAI(api_key=api_key)
+try:
+    import pybase64 as base64
+except ImportError:  # Optional: SIMD encoder, falls back to the stdlib
+    import base64
 
-    if progress_callback:
-        progress_callback("Generating structured JSON report with OpenAI GPT model...")
 
-    # System prompt for JSON-structured output
-    system_prompt = """You are a senior radiologist. Analyze the chest X-ray image and generate a structured JSON report.
+# System prompt for JSON-structured output
+_SYSTEM_PROMPT = """You are a senior radiologist. Analyze the chest X-ray image and generate a structured JSON report.
 
 The report must follow this exact JSON schema:
 {
@@ -91,30 +51,60 @@ Important:
 - Use standard radiological terminology
 - Return ONLY valid JSON, no additional text"""
 
+
+def _build_request_kwargs(
+    image: Optional[Image.Image],
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    image_bytes: Optional[bytes] = None,
+    mime: str = "image/jpeg",
+) -> Dict[str, Any]:
+    """
+    Build the chat completion arguments shared by the sync and async generators.
+    
+    Already-encoded image_bytes are base64-encoded as-is; otherwise the PIL
+    image is resized and re-encoded as JPEG.
+    """
+    if image_bytes is not None:
+        img_b64 = base64.b64encode(image_bytes).decode("ascii")
+    elif image is not None:
+        img_b64 = encode_image(image)
+        mime = "image/jpeg"
+    else:
+        raise ValueError("Either image or image_bytes must be provided.")
+    return {
+        "model": model_name,
+        "messages": [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{img_b64}"}}
+                ],
+            },
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        # JSON mode for every model, so replies parse without the markdown fallback
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _parse_report_response(response_text: str) -> Dict[str, Any]:
+    """
+    Parse the model's reply into a normalized report dictionary.
+    
+    Raises:
+        ValueError: If the reply does not contain valid JSON
+    """
     try:
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"}}
-                    ],
-                },
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"} if "gpt-4" in model_name.lower() or "o1" in model_name.lower() else None,
-        )
-        
-        response_text = response.choices[0].message.content.strip()
-        
         # Parse JSON response
         try:
-            report_json = json.loads(response_text)
-        except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks if present
+            report_json = orjson.loads(response_text)
+        except orjson.JSONDecodeError:
+            # Defensive: JSON mode should make this unreachable, but older
+            # models may still wrap the JSON in markdown code blocks
             if "```json" in response_text:
                 json_start = response_text.find("```json") + 7
                 json_end = response_text.find("```", json_start)
@@ -124,11 +114,121 @@ Important:
                 json_end = response_text.find("```", json_start)
                 response_text = response_text[json_start:json_end].strip()
             
-            report_json = json.loads(response_text)
-        
-        # Validate and normalize structure
-        return _normalize_report_structure(report_json)
+            report_json = orjson.loads(response_text)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse JSON response from model: {e}\nResponse: {response_text[:500]}") from e
+    
+    # Validate and normalize structure
+    return _normalize_report_structure(report_json)
+
+
+def generate_json_report(
+    image: Optional[Image.Image],
+    api_key: str,
+    model_name: str = "gpt-4o",
+    temperature: float = 0.2,
+    max_tokens: int = 2048,
+    progress_callback: Optional[Callable[[str], None]] = None,
+    image_bytes: Optional[bytes] = None,
+    mime: str = "image/jpeg",
+) -> Dict[str, Any]:
+    """
+    Generate a structured radiology report in JSON format using OpenAI GPT model with vision support.
+    
+    Returns a dictionary with:
+    - findings: List of findings with evidence and confidence
+    - impression: Overall clinical impression
+    - recommendations: Clinical recommendations
+    - metadata: Report metadata
+    
+    Pass image_bytes (with its mime type) instead of image to send an
+    already-encoded JPEG/PNG/WEBP without decoding and re-encoding it.
+    """
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is required to generate a radiology report.")
+
+    try:
+        from openai import OpenAIError, RateLimitError
+    except ImportError as exc:
+        raise ImportError("OpenAI library not installed. Run: pip install openai") from exc
+
+    request_kwargs = _build_request_kwargs(image, model_name, temperature, max_tokens, image_bytes, mime)
+    client = get_client(api_key)
+
+    if progress_callback:
+        progress_callback("Generating structured JSON report with OpenAI GPT model...")
+
+    try:
+        response = client.chat.completions.create(**request_kwargs)
+    except RateLimitError as e:
+        raise RuntimeError(
+            "OpenAI API reported 'insufficient_quota' or rate limiting. "
+            "Please check your OpenAI plan/billing status or wait before retrying."
+        ) from e
+    except OpenAIError as e:
+        raise RuntimeError(f"OpenAI API error: {e}") from e
+
+    return _parse_report_response(response.choices[0].message.content.strip())
+
+
+def generate_json_reports(
+    images: List[Optional[Image.Image]],
+    api_key: str,
+    max_workers: int = 8,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Generate JSON reports for several images concurrently.
+    
+    Each call spends nearly all its time waiting on the network, so a thread
+    pool overlaps the round trips; the threads share the cached OpenAI client
+    and its connection pool.
+    
+    Args:
+        images: Images to report on
+        api_key: OpenAI API key
+        max_workers: Maximum number of reports generated at once
+        **kwargs: Further generate_json_report arguments, applied to every image
         
+    Returns:
+        Reports in the same order as images. The first failure is raised.
+    """
+    if not images:
+        return []
+    
+    generate = partial(generate_json_report, api_key=api_key, **kwargs)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(images))) as executor:
+        return list(executor.map(generate, images))
+
+
+async def generate_json_report_async(
+    image: Optional[Image.Image],
+    api_key: str,
+    model_name: str = "gpt-4o",
+    temperature: float = 0.2,
+    max_tokens: int = 2048,
+    image_bytes: Optional[bytes] = None,
+    mime: str = "image/jpeg",
+) -> Dict[str, Any]:
+    """
+    Async variant of generate_json_report using the AsyncOpenAI client.
+    
+    Awaiting the network round trip lets the event loop serve other requests
+    while the model is generating.
+    """
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is required to generate a radiology report.")
+
+    try:
+        from openai import OpenAIError, RateLimitError
+    except ImportError as exc:
+        raise ImportError("OpenAI library not installed. Run: pip install openai") from exc
+
+    request_kwargs = _build_request_kwargs(image, model_name, temperature, max_tokens, image_bytes, mime)
+    client = get_async_client(api_key)
+
+    try:
+        response = await client.chat.completions.create(**request_kwargs)
     except RateLimitError as e:
         raise RuntimeError(
             "OpenAI API reported 'insufficient_quota' or rate limiting. "
@@ -136,14 +236,44 @@ Important:
         ) from e
     except OpenAIError as e:
         raise RuntimeError(f"OpenAI API error: {e}") from e
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse JSON response from model: {e}\nResponse: {response_text[:500]}") from e
+
+    return _parse_report_response(response.choices[0].message.content.strip())
+
+
+# Keys of a normalized report and finding, in output order
+_REPORT_KEYS = ("findings", "impression", "recommendations", "metadata")
+_FINDING_KEYS = ("finding", "location", "evidence", "confidence", "severity")
+
+
+def _is_normalized(report: Any) -> bool:
+    """
+    Check whether a report already has exactly the normalized shape.
+    
+    True only if normalizing would produce an equal dictionary with the same
+    key order, so the report can be used as-is.
+    """
+    if type(report) is not dict or tuple(report) != _REPORT_KEYS:
+        return False
+    if type(report["recommendations"]) is not list or type(report["metadata"]) is not dict:
+        return False
+    
+    findings = report["findings"]
+    return type(findings) is list and all(
+        type(finding) is dict
+        and tuple(finding) == _FINDING_KEYS
+        and type(finding["confidence"]) is float
+        for finding in findings
+    )
 
 
 def _normalize_report_structure(report: Dict[str, Any]) -> Dict[str, Any]:
     """
     Normalize and validate the report structure to ensure all required fields exist.
     """
+    # Fast path: JSON-mode replies usually follow the schema exactly
+    if _is_normalized(report):
+        return report
+    
     normalized = {
         "findings": [],
         "impression": "",
@@ -185,39 +315,40 @@ def format_json_report_to_text(report_json: Dict[str, Any]) -> str:
     """
     Convert JSON report to human-readable text format.
     """
-    text = "=== RADIOLOGY REPORT ===\n\n"
+    # Collect the pieces and join once instead of growing a string
+    parts = ["=== RADIOLOGY REPORT ===\n\n"]
+    append = parts.append
     
     # Findings
-    text += "FINDINGS:\n"
+    append("FINDINGS:\n")
     if report_json.get("findings"):
         for i, finding in enumerate(report_json["findings"], 1):
-            text += f"\n{i}. {finding.get('finding', 'Unknown')}"
+            append(f"\n{i}. {finding.get('finding', 'Unknown')}")
             if finding.get('location'):
-                text += f" - Location: {finding['location']}"
+                append(f" - Location: {finding['location']}")
             if finding.get('severity'):
-                text += f" - Severity: {finding['severity']}"
-            text += f"\n   Confidence: {finding.get('confidence', 0):.1%}"
+                append(f" - Severity: {finding['severity']}")
+            append(f"\n   Confidence: {finding.get('confidence', 0):.1%}")
             if finding.get('evidence'):
-                text += f"\n   Evidence: {finding['evidence']}"
-            text += "\n"
+                append(f"\n   Evidence: {finding['evidence']}")
+            append("\n")
     else:
-        text += "No significant findings detected.\n"
+        append("No significant findings detected.\n")
     
     # Impression
-    text += "\nIMPRESSION:\n"
-    text += report_json.get("impression", "No impression provided.") + "\n"
+    append("\nIMPRESSION:\n")
+    append(report_json.get("impression", "No impression provided.") + "\n")
     
     # Recommendations
     if report_json.get("recommendations"):
-        text += "\nRECOMMENDATIONS:\n"
+        append("\nRECOMMENDATIONS:\n")
         for i, rec in enumerate(report_json["recommendations"], 1):
-            text += f"{i}. {rec}\n"
+            append(f"{i}. {rec}\n")
     
     # Metadata
     if report_json.get("metadata"):
-        text += "\nMETADATA:\n"
+        append("\nMETADATA:\n")
         for key, value in report_json["metadata"].items():
-            text += f"- {key}: {value}\n"
+            append(f"- {key}: {value}\n")
     
-    return text
-
+    return "".join(parts)
@@ -0,0 +1,130 @@
+"""
+Log Store Module
+Append-only JSON Lines storage for the feedback log and learning data.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# Lock file guarding the feedback log, learning data and analytics snapshot
+LOCK_FILENAME = "feedback.lock"
+
+# Serializes read-modify-write cycles on the log files across threads;
+# an flock on a lock file extends this to multiple worker processes
+_log_lock = threading.Lock()
+
+
+@contextmanager
+def locked(lock_path: Path):
+    """
+    Hold the thread lock and, where supported, an exclusive file lock.
+    
+    Not reentrant: a thread must not take it again while holding it.
+    """
+    with _log_lock:
+        if fcntl is None:
+            yield
+            return
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def append_jsonl(path: Path, entry: Dict[str, Any]) -> None:
+    """Append one entry to a JSON Lines file as a single line."""
+    with open(path, "ab") as f:
+        f.write(orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the entries of a JSON Lines file one at a time.
+    
+    A missing file yields nothing. Blank lines and lines that fail to parse
+    (e.g. left behind by an interrupted write) are skipped.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+
+
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    """Load every entry of a JSON Lines file into a list."""
+    return list(iter_jsonl(path))
+
+
+def replay_feedback_log(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Rebuild the current feedback log from its append-only history.
+    
+    Each entry replaces its image's pending (unedited) entry in place if
+    there is one and is appended otherwise, which is the rule log_feedback
+    applies when writing. An image has at most one pending entry.
+    """
+    logs = []
+    pending = {}  # image name -> index of its unedited entry
+    
+    for entry in entries:
+        image = entry.get("image")
+        index = pending.pop(image, None)
+        if index is None:
+            index = len(logs)
+            logs.append(entry)
+        else:
+            logs[index] = entry
+        
+        if not entry.get("has_edits", False):
+            pending[image] = index
+    
+    return logs
+
+
+def load_feedback_log(path: Path) -> List[Dict[str, Any]]:
+    """Load the current feedback log from a JSON Lines history file."""
+    return replay_feedback_log(iter_jsonl(path))
+
+
+def migrate_json_array(legacy_path: Path, jsonl_path: Path) -> None:
+    """
+    Convert a legacy JSON array log file to JSON Lines.
+    
+    Does nothing if the JSON Lines file already exists or there is no
+    readable legacy file. The legacy file is left in place.
+    """
+    if jsonl_path.exists() or not legacy_path.exists():
+        return
+    
+    try:
+        entries = orjson.loads(legacy_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return
+    if not isinstance(entries, list):
+        return
+    
+    tmp_path = jsonl_path.with_name(f"{jsonl_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        for entry in entries:
+            f.write(orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+    os.replace(tmp_path, jsonl_path)
@@ -1,35 +1,42 @@
-import json
 import os
 from pathlib import Path
 
-def log_results(result_dict, log_path="outputs/logs.json"):
+from modules.log_store import append_jsonl, migrate_json_array, read_jsonl
+
+def log_results(result_dict, log_path="outputs/logs.jsonl"):
     """
-    Log results to a JSON file.
+    Append results to a JSON Lines log file.
+    
+    Each call writes one line, so the existing log is never re-read or
+    rewritten. A legacy logs.json array next to the file is converted the
+    first time the JSON Lines log is created.
     
     Args:
         result_dict: Dictionary containing results to log
-        log_path: Path to the log file (default: outputs/logs.json)
-        
+        log_path: Path to the log file (default: outputs/logs.jsonl)
+    
     Raises:
-        OSError: If the file cannot be written
-        json.JSONEncodeError: If the data cannot be serialized to JSON
+        RuntimeError: If the data cannot be serialized or the file cannot be written
     """
-    log_dir = Path(log_path).parent
-    log_dir.mkdir(parents=True, exist_ok=True)
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    try:
-        with open(log_path, "r", encoding="utf-8") as f:
-            logs = json.load(f)
-    except FileNotFoundError:
-        logs = []
-    except json.JSONDecodeError:
-        # If file exists but is corrupted, start fresh
-        logs = []
-
-    logs.append(result_dict)
+    if log_path.suffix == ".jsonl":
+        migrate_json_array(log_path.with_suffix(".json"), log_path)
 
     try:
-        with open(log_path, "w", encoding="utf-8") as f:
-            json.dump(logs, f, indent=2, ensure_ascii=False)
-    except (OSError, json.JSONEncodeError) as e:
+        append_jsonl(log_path, result_dict)
+    except (OSError, TypeError) as e:  # orjson.JSONEncodeError is a TypeError
         raise RuntimeError(f"Failed to write log file: {e}") from e
+
+def read_logs(log_path="outputs/logs.jsonl"):
+    """
+    Read every entry of a results log written by log_results.
+    
+    Args:
+        log_path: Path to the log file (default: outputs/logs.jsonl)
+    
+    Returns:
+        List of logged result dictionaries; empty if the file does not exist
+    """
+    return read_jsonl(Path(log_path))
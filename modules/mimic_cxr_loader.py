@@ -2,10 +2,30 @@
 MIMIC-CXR Dataset Loader
 Loads real CheXpert labels from mimic-cxr.csv for validation.
 """
+from functools import cached_property
+
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional
 from pathlib import Path
 
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = "pyarrow"
+except ImportError:  # Optional: multithreaded CSV parsing, falls back to pandas' C parser
+    _CSV_ENGINE = "c"
+
+
+# CheXpert label columns (excluding filename, split, label)
+LABEL_COLUMNS = [
+    'Atelectasis', 'Cardiomegaly', 'Consolidation', 'Edema',
+    'Enlarged Cardiomediastinum', 'Lung Lesion', 'Lung Opacity',
+    'Normal', 'Pleural Effusion', 'Pneumonia', 'Pneumothorax'
+]
+
+# Other columns the loader reads; anything else in the CSV is skipped
+METADATA_COLUMNS = ['filename', 'split', 'label']
+
 
 class MIMICCXRLoader:
     """
@@ -29,49 +49,59 @@ class MIMICCXRLoader:
             raise FileNotFoundError(f"MIMIC-CXR CSV file not found: {self.csv_path}")
         
         try:
-            self.df = pd.read_csv(self.csv_path)
+            # Only parse the columns in use, with labels as float32
+            header = pd.read_csv(self.csv_path, nrows=0).columns
+            wanted = set(LABEL_COLUMNS).union(METADATA_COLUMNS)
+            usecols = [col for col in header if col in wanted]
+            self.df = pd.read_csv(
+                self.csv_path,
+                engine=_CSV_ENGINE,
+                usecols=usecols,
+                dtype={col: "float32" for col in LABEL_COLUMNS if col in usecols}
+            )
             # Create a lookup dictionary for faster access
             self._create_lookup()
         except Exception as e:
             raise ValueError(f"Failed to load MIMIC-CXR CSV: {e}") from e
     
     def _create_lookup(self):
-        """Create a lookup dictionary mapping filename to labels."""
+        """Create lookup dictionaries mapping filename to labels and metadata."""
         self.lookup = {}
-        for _, row in self.df.iterrows():
-            filename = row['filename']
-            labels = self._extract_labels_from_row(row)
+        self._meta_lookup = {}
+        
+        # Compare all label cells at once instead of walking rows
+        cols = [col for col in LABEL_COLUMNS if col in self.df.columns]
+        positive = self.df[cols].to_numpy() == 1.0
+        if 'Normal' in self.df.columns:
+            normal = self.df['Normal'].to_numpy() == 1.0
+        else:
+            normal = np.zeros(len(self.df), dtype=bool)
+        
+        row_count = len(self.df)
+        splits = self.df['split'].tolist() if 'split' in self.df.columns else ['unknown'] * row_count
+        label_texts = self.df['label'].tolist() if 'label' in self.df.columns else [''] * row_count
+        
+        for i, filename in enumerate(self.df['filename'].tolist()):
+            labels = [cols[j] for j in np.flatnonzero(positive[i])]
+            if not labels and normal[i]:
+                labels = ["No Finding"]
             self.lookup[filename] = labels
-    
-    def _extract_labels_from_row(self, row: pd.Series) -> List[str]:
-        """
-        Extract CheXpert labels from a CSV row.
-        
-        Args:
-            row: Pandas Series representing a row from the CSV
-            
-        Returns:
-            List of label names where value is 1.0
-        """
-        labels = []
-        
-        # CheXpert label columns (excluding filename, split, label)
-        label_columns = [
-            'Atelectasis', 'Cardiomegaly', 'Consolidation', 'Edema',
-            'Enlarged Cardiomediastinum', 'Lung Lesion', 'Lung Opacity',
-            'Normal', 'Pleural Effusion', 'Pneumonia', 'Pneumothorax'
-        ]
-        
-        for col in label_columns:
-            if col in row and row[col] == 1.0:
-                labels.append(col)
-        
-        # If no labels found and Normal is 0, return empty list
-        # If Normal is 1.0, return ["No Finding"]
-        if not labels and row.get('Normal', 0) == 1.0:
-            return ["No Finding"]
-        
-        return labels
+            # Metadata describes a filename's first row; lookup keeps its last
+            self._meta_lookup.setdefault(filename, {
+                "labels": labels,
+                "split": splits[i],
+                "label_text": label_texts[i],
+                "filename": filename
+            })
+        
+        # Case-insensitive indexes; the first filename wins on a collision, as
+        # with the scans these replace
+        self._lookup_lower = {}
+        for key, labels in self.lookup.items():
+            self._lookup_lower.setdefault(key.lower(), labels)
+        self._meta_lookup_lower = {}
+        for key, metadata in self._meta_lookup.items():
+            self._meta_lookup_lower.setdefault(key.lower(), metadata)
     
     def get_labels(self, filename: str) -> Optional[List[str]]:
         """
@@ -93,14 +123,11 @@ class MIMICCXRLoader:
             return self.lookup[base_filename]
         
         # Try case-insensitive match
-        filename_lower = filename.lower()
-        base_filename_lower = base_filename.lower()
+        labels = self._lookup_lower.get(filename.lower())
+        if labels is None:
+            labels = self._lookup_lower.get(base_filename.lower())
         
-        for key in self.lookup.keys():
-            if key.lower() == filename_lower or key.lower() == base_filename_lower:
-                return self.lookup[key]
-        
-        return None
+        return labels
     
     def get_labels_with_metadata(self, filename: str) -> Optional[Dict]:
         """
@@ -114,27 +141,16 @@ class MIMICCXRLoader:
         """
         base_filename = Path(filename).name
         
-        # Find matching row
-        matching_row = self.df[self.df['filename'] == base_filename]
+        # Exact match first, then case-insensitive
+        metadata = self._meta_lookup.get(base_filename)
+        if metadata is None:
+            metadata = self._meta_lookup_lower.get(base_filename.lower())
         
-        if matching_row.empty:
-            # Try case-insensitive
-            matching_row = self.df[
-                self.df['filename'].str.lower() == base_filename.lower()
-            ]
-        
-        if matching_row.empty:
+        if metadata is None:
             return None
         
-        row = matching_row.iloc[0]
-        labels = self._extract_labels_from_row(row)
-        
-        return {
-            "labels": labels,
-            "split": row.get('split', 'unknown'),
-            "label_text": row.get('label', ''),
-            "filename": row.get('filename', filename)
-        }
+        # Fresh dict and label list so callers cannot alter the index
+        return dict(metadata, labels=list(metadata["labels"]))
     
     def get_statistics(self) -> Dict:
         """
@@ -143,31 +159,30 @@ class MIMICCXRLoader:
         Returns:
             Dictionary with dataset statistics
         """
+        return self.statistics
+    
+    @cached_property
+    def statistics(self) -> Dict:
+        """
+        Dataset statistics, computed on first access and then reused.
+        
+        Callers must treat the returned dictionary as read-only.
+        """
         if self.df is None:
             return {}
         
-        total_images = len(self.df)
-        train_count = len(self.df[self.df['split'] == 'train'])
-        test_count = len(self.df[self.df['split'] == 'test'])
-        val_count = len(self.df[self.df['split'] == 'val'])
+        # One pass over the split column instead of a mask per split
+        split_counts = self.df['split'].value_counts()
         
         # Count label frequencies
-        label_counts = {}
-        label_columns = [
-            'Atelectasis', 'Cardiomegaly', 'Consolidation', 'Edema',
-            'Enlarged Cardiomediastinum', 'Lung Lesion', 'Lung Opacity',
-            'Normal', 'Pleural Effusion', 'Pneumonia', 'Pneumothorax'
-        ]
-        
-        for col in label_columns:
-            if col in self.df.columns:
-                label_counts[col] = int(self.df[col].sum())
+        cols = [col for col in LABEL_COLUMNS if col in self.df.columns]
+        label_counts = {col: int(total) for col, total in self.df[cols].sum().items()}
         
         return {
-            "total_images": total_images,
-            "train": train_count,
-            "test": test_count,
-            "val": val_count,
+            "total_images": len(self.df),
+            "train": int(split_counts.get('train', 0)),
+            "test": int(split_counts.get('test', 0)),
+            "val": int(split_counts.get('val', 0)),
             "label_frequencies": label_counts
         }
     
@@ -184,18 +199,21 @@ class MIMICCXRLoader:
         if self.df is None:
             return []
         
-        # Create a mask for rows that have all specified labels
-        mask = pd.Series([True] * len(self.df))
+        # Resolve the columns first, then test every row in one reduction
+        cols = []
+        need_normal = False
         
         for label in labels:
             if label == "No Finding":
-                mask = mask & (self.df['Normal'] == 1.0)
+                need_normal = True
             elif label in self.df.columns:
-                mask = mask & (self.df[label] == 1.0)
+                cols.append(label)
             else:
                 # Label not found in dataset
                 return []
         
-        matching_rows = self.df[mask]
-        return matching_rows['filename'].tolist()
-
+        mask = (self.df[cols].to_numpy() == 1.0).all(axis=1)
+        if need_normal:
+            mask &= self.df['Normal'].to_numpy() == 1.0
+        
+        return self.df['filename'].to_numpy()[mask].tolist()
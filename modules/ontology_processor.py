@@ -2,9 +2,69 @@
 Ontology Processor Module
 Processes reports using RadLex and CheXpert ontologies for validation and mapping.
 """
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 import json
 
+try:
+    import ahocorasick
+except ImportError:  # Optional: keyword matching falls back to substring checks
+    ahocorasick = None
+
+
+class RadLexKeywordIndex:
+    """
+    Lowercased RadLex keywords indexed for matching in a single scan.
+    
+    Independent of the CheXpert labels, so one index per RadLex table can be
+    shared by every OntologyProcessor built from it. Texts are scanned with an
+    Aho-Corasick automaton when pyahocorasick is installed.
+    """
+    
+    def __init__(self, radlex_terms: Dict[str, List[str]]):
+        """
+        Build the index.
+        
+        Args:
+            radlex_terms: Dictionary mapping condition names to RadLex keywords
+        """
+        self.keyword_to_condition = {}
+        
+        # (condition, keyword) pairs in table order and, per lowercased
+        # keyword, the positions of the pairs it stands for
+        self.entries = []
+        self._term_entries = {}
+        
+        for condition, keywords in radlex_terms.items():
+            for keyword in keywords:
+                keyword_lower = keyword.lower()
+                self.keyword_to_condition[keyword_lower] = condition
+                self._term_entries.setdefault(keyword_lower, []).append(len(self.entries))
+                self.entries.append((condition, keyword))
+        
+        # The automaton cannot hold the empty string, which matches any text
+        self._automaton = None
+        terms = [term for term in self._term_entries if term]
+        if ahocorasick is not None and terms:
+            self._automaton = ahocorasick.Automaton()
+            for term in terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+    
+    def match(self, text: str) -> List[int]:
+        """Return the positions in entries of the keywords found in a lowercased text."""
+        if self._automaton is None:
+            found = [term for term in self._term_entries if term in text]
+        else:
+            found = {term for _, term in self._automaton.iter(text)}
+            if "" in self._term_entries:
+                found.add("")
+        
+        entry_ids = []
+        for term in found:
+            entry_ids.extend(self._term_entries[term])
+        entry_ids.sort()
+        return entry_ids
+
 
 class OntologyProcessor:
     """
@@ -12,24 +72,54 @@ class OntologyProcessor:
     Maps findings to standard terminology and validates against known conditions.
     """
     
-    def __init__(self, radlex_terms: Dict[str, List[str]], chexpert_labels: List[str]):
+    def __init__(
+        self,
+        radlex_terms: Dict[str, List[str]],
+        chexpert_labels: List[str],
+        keyword_index: Optional[RadLexKeywordIndex] = None
+    ):
         """
         Initialize the ontology processor.
         
         Args:
             radlex_terms: Dictionary mapping condition names to RadLex keywords
             chexpert_labels: List of CheXpert label names
+            keyword_index: Optional prebuilt RadLexKeywordIndex(radlex_terms)
         """
         self.radlex_terms = radlex_terms
         self.chexpert_labels = chexpert_labels
+        self._keyword_index = keyword_index
         self._build_reverse_mapping()
     
     def _build_reverse_mapping(self):
         """Build reverse mapping from keywords to conditions."""
-        self.keyword_to_condition = {}
-        for condition, keywords in self.radlex_terms.items():
-            for keyword in keywords:
-                self.keyword_to_condition[keyword.lower()] = condition
+        if self._keyword_index is None:
+            self._keyword_index = RadLexKeywordIndex(self.radlex_terms)
+        self.keyword_to_condition = self._keyword_index.keyword_to_condition
+        
+        # Lowercased once here rather than on every match
+        self._chexpert_lower = [label.lower() for label in self.chexpert_labels]
+    
+    def _match_terms(self, text: str) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Match the RadLex and CheXpert terms found in a lowercased text.
+        
+        Returns:
+            Tuple of (conditions, keywords, CheXpert labels), each in table
+            order; conditions and keywords are unique
+        """
+        entries = self._keyword_index.entries
+        entry_ids = self._keyword_index.match(text)
+        
+        # dict.fromkeys de-duplicates while keeping the first occurrence's position
+        keywords = list(dict.fromkeys(entries[i][1] for i in entry_ids))
+        conditions = list(dict.fromkeys(entries[i][0] for i in entry_ids))
+        labels = [
+            label for label, label_lower in zip(self.chexpert_labels, self._chexpert_lower)
+            if label_lower in text
+        ]
+        
+        return conditions, keywords, labels
     
     def map_findings_to_ontology(self, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -41,41 +131,38 @@ class OntologyProcessor:
         Returns:
             List of findings with ontology mappings added
         """
-        mapped_findings = []
+        return self.map_findings_to_ontology_batch(findings)
+    
+    def map_findings_to_ontology_batch(self, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Map a batch of findings column by column.
         
-        for finding in findings:
-            finding_name = finding.get("finding", "").lower()
-            evidence = finding.get("evidence", "").lower()
-            combined_text = f"{finding_name} {evidence}"
-            
-            # Find matching RadLex terms
-            matched_conditions = []
-            matched_keywords = []
-            
-            for condition, keywords in self.radlex_terms.items():
-                for keyword in keywords:
-                    if keyword.lower() in combined_text:
-                        if condition not in matched_conditions:
-                            matched_conditions.append(condition)
-                        matched_keywords.append(keyword)
-            
-            # Check CheXpert labels
-            chexpert_matches = []
-            for label in self.chexpert_labels:
-                if label.lower() in combined_text:
-                    chexpert_matches.append(label)
+        The texts, matches and confidences are built as separate columns and
+        only zipped back into finding dictionaries at the end, so each step is
+        a tight loop over one kind of value.
+        
+        Args:
+            findings: List of finding dictionaries from JSON report
             
-            # Create enhanced finding
+        Returns:
+            List of findings with ontology mappings added, in input order
+        """
+        texts = [
+            f"{finding.get('finding', '').lower()} {finding.get('evidence', '').lower()}"
+            for finding in findings
+        ]
+        matches = [self._match_terms(text) for text in texts]
+        confidences = [finding.get("confidence", 0.5) for finding in findings]
+        
+        mapped_findings = []
+        for finding, (conditions, keywords, labels), confidence in zip(findings, matches, confidences):
             enhanced_finding = finding.copy()
             enhanced_finding["ontology_mapping"] = {
-                "radlex_conditions": matched_conditions,
-                "radlex_keywords": list(set(matched_keywords)),
-                "chexpert_labels": chexpert_matches,
-                "mapping_confidence": self._calculate_mapping_confidence(
-                    matched_conditions, chexpert_matches, finding.get("confidence", 0.5)
-                )
+                "radlex_conditions": conditions,
+                "radlex_keywords": keywords,
+                "chexpert_labels": labels,
+                "mapping_confidence": self._calculate_mapping_confidence(conditions, labels, confidence)
             }
-            
             mapped_findings.append(enhanced_finding)
         
         return mapped_findings
@@ -143,23 +230,10 @@ class OntologyProcessor:
         """
         Suggest standard RadLex/CheXpert terms based on finding text.
         """
-        suggestions = []
-        finding_lower = finding_text.lower()
-        
-        # Check against all RadLex terms
-        for condition, keywords in self.radlex_terms.items():
-            for keyword in keywords:
-                if keyword.lower() in finding_lower:
-                    if condition not in suggestions:
-                        suggestions.append(condition)
-        
-        # Check against CheXpert labels
-        for label in self.chexpert_labels:
-            if label.lower() in finding_lower:
-                if label not in suggestions:
-                    suggestions.append(label)
+        conditions, _, labels = self._match_terms(finding_text.lower())
         
-        return suggestions
+        # RadLex conditions first, then CheXpert labels not already suggested
+        return list(dict.fromkeys(conditions + labels))
     
     def get_ontology_statistics(self, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
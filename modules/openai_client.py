@@ -0,0 +1,41 @@
+"""
+OpenAI Client Module
+Shares OpenAI clients, and with them their HTTP connection pools, across report requests.
+"""
+import asyncio
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8)
+def get_client(api_key: str):
+    """
+    Return the OpenAI client for an API key, creating it on first use.
+    
+    The client is thread-safe, so concurrent report calls share its
+    connection pool instead of each opening new TLS connections.
+    
+    Raises:
+        ImportError: If the openai package is not installed
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def get_async_client(api_key: str):
+    """
+    Return the AsyncOpenAI client for an API key on the running event loop.
+    
+    Async connection pools belong to the loop that opened them, so clients
+    are cached per loop. Must be called from a coroutine.
+    
+    Raises:
+        ImportError: If the openai package is not installed
+    """
+    return _get_async_client(api_key, asyncio.get_running_loop())
+
+
+@lru_cache(maxsize=8)
+def _get_async_client(api_key: str, loop: asyncio.AbstractEventLoop):
+    """Create the AsyncOpenAI client cached for (api_key, loop)."""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key)
@@ -1,10 +1,16 @@
-import json
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
+@lru_cache(maxsize=1)
 def load_radlex_terms(filepath: str) -> dict:
     """
     Load RadLex terms from a JSON file.
     
+    The parsed terms are cached per path; callers must treat the returned
+    dictionary as read-only.
+    
     Args:
         filepath: Path to the JSON file containing RadLex terms
         
@@ -13,14 +19,13 @@ def load_radlex_terms(filepath: str) -> dict:
         
     Raises:
         FileNotFoundError: If the file doesn't exist
-        json.JSONDecodeError: If the file contains invalid JSON
+        ValueError: If the file contains invalid JSON
     """
     path = Path(filepath)
     if not path.exists():
         raise FileNotFoundError(f"RadLex terms file not found: {filepath}")
     
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        return orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in RadLex terms file: {e}") from e
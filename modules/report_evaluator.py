@@ -1,9 +1,29 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from modules.ontology_processor import RadLexKeywordIndex
+
+
+def build_radlex_index(radlex_dict: Dict[str, List[str]]) -> RadLexKeywordIndex:
+    """
+    Index the lowercased RadLex keywords of every label for single-scan matching.
+    
+    Build once per RadLex dictionary and pass the result to
+    compare_labels_with_report (or OntologyProcessor) to skip per-request
+    indexing.
+    
+    Args:
+        radlex_dict: Dictionary mapping labels to lists of RadLex keywords
+        
+    Returns:
+        RadLexKeywordIndex over radlex_dict
+    """
+    return RadLexKeywordIndex(radlex_dict)
 
 def compare_labels_with_report(
     labels: List[str], 
     report_text: str, 
-    radlex_dict: Dict[str, List[str]]
+    radlex_dict: Dict[str, List[str]],
+    radlex_index: Optional[RadLexKeywordIndex] = None
 ) -> tuple[List[str], List[str]]:
     """
     Compare CheXpert labels with the generated radiology report.
@@ -12,16 +32,22 @@ def compare_labels_with_report(
         labels: List of CheXpert labels to check
         report_text: The generated radiology report text
         radlex_dict: Dictionary mapping labels to lists of RadLex keywords
+        radlex_index: Optional precomputed output of build_radlex_index(radlex_dict)
         
     Returns:
         Tuple of (matched_labels, missed_labels)
     """
+    if radlex_index is None:
+        radlex_index = build_radlex_index(radlex_dict)
+    
+    # Labels with a keyword in the report, found in a single scan
+    entries = radlex_index.entries
+    hits = {entries[i][0] for i in radlex_index.match(report_text.lower())}
     matched = []
     missed = []
 
     for label in labels:
-        keywords = radlex_dict.get(label, [])
-        if any(term.lower() in report_text.lower() for term in keywords):
+        if label in hits:
             matched.append(label)
         else:
             missed.append(label)
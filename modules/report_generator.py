@@ -1,27 +1,9 @@
-import base64
-from io import BytesIO
 from typing import Optional, Callable
 
 from PIL import Image
 
-
-def encode_image(image: Image.Image, max_size: int = 512) -> str:
-    """
-    Convert PIL Image to a resized base64 string for OpenAI vision models.
-    """
-    width, height = image.size
-    if width > max_size or height > max_size:
-        if width > height:
-            new_width = max_size
-            new_height = int(height * (max_size / width))
-        else:
-            new_height = max_size
-            new_width = int(width * (max_size / height))
-        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-    buffered = BytesIO()
-    image.save(buffered, format="JPEG", quality=80, optimize=True)
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+from modules._image_encoding import encode_image
+from modules.openai_client import get_client
 
 
 def generate_radiology_report(
@@ -39,12 +21,12 @@ def generate_radiology_report(
         raise ValueError("OPENAI_API_KEY is required to generate a radiology report.")
 
     try:
-        from openai import OpenAI, OpenAIError, RateLimitError
+        from openai import OpenAIError, RateLimitError
     except ImportError as exc:
         raise ImportError("OpenAI library not installed. Run: pip install openai") from exc
 
     img_b64 = encode_image(image)
-    client = OpenAI(api_key=api_key)
+    client = get_client(api_key)
 
     if progress_callback:
         progress_callback("Generating report with OpenAI GPT model...")